@@ -8,6 +8,7 @@ Create Date: 2024-12-15 12:00:00.000000
 from collections.abc import Sequence
 
 import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
 from sqlalchemy.dialects import postgresql
 
 from alembic import op
@@ -34,11 +35,12 @@ def upgrade() -> None:
             server_default=sa.text("uuid_generate_v4()"),
         ),
         sa.Column("title", sa.String(255), nullable=False),
-        sa.Column("content", sa.Text(), nullable=False),
-        sa.Column("content_type", sa.String(50), nullable=False),
-        sa.Column("source_url", sa.String(500), nullable=True),
+        sa.Column("source_type", sa.String(50), nullable=False),
+        sa.Column("source_url", sa.Text(), nullable=True),
+        sa.Column("content_hash", sa.String(64), nullable=False, unique=True),
         sa.Column("file_path", sa.String(500), nullable=True),
-        sa.Column("metadata_", sa.JSON(), nullable=True),
+        # JSONB rather than JSON, which has no operator class for GIN indexes
+        sa.Column("metadata", postgresql.JSONB(), nullable=True),
         sa.Column("word_count", sa.Integer(), nullable=True),
         sa.Column("character_count", sa.Integer(), nullable=True),
         sa.Column(
@@ -74,9 +76,10 @@ def upgrade() -> None:
         sa.Column("start_char", sa.Integer(), nullable=True),
         sa.Column("end_char", sa.Integer(), nullable=True),
         sa.Column("word_count", sa.Integer(), nullable=True),
-        sa.Column("embedding", postgresql.ARRAY(sa.Float), nullable=True),
+        sa.Column("token_count", sa.Integer(), nullable=True),
+        sa.Column("embedding", Vector(1536), nullable=True),
         sa.Column("embedding_model", sa.String(100), nullable=True),
-        sa.Column("metadata_", sa.JSON(), nullable=True),
+        sa.Column("metadata", postgresql.JSONB(), nullable=True),
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
@@ -102,26 +105,26 @@ def upgrade() -> None:
             server_default=sa.text("uuid_generate_v4()"),
         ),
         sa.Column("document_id", postgresql.UUID(as_uuid=True), nullable=False),
-        sa.Column("chunk_ids", postgresql.ARRAY(postgresql.UUID), nullable=False),
+        sa.Column("chunk_ids", postgresql.ARRAY(postgresql.UUID), nullable=True),
         sa.Column(
             "question_type",
             sa.String(50),
             nullable=False,
             server_default="multiple_choice",
         ),
-        sa.Column("difficulty", sa.String(20), nullable=False),
-        sa.Column("bloom_level", sa.String(20), nullable=False),
-        sa.Column("stem", sa.Text(), nullable=False),
-        sa.Column("options", sa.JSON(), nullable=False),
-        sa.Column("correct_answer", sa.String(10), nullable=False),
+        sa.Column("difficulty_level", sa.String(20), nullable=True),
+        sa.Column("bloom_level", sa.String(50), nullable=True),
+        sa.Column("question_text", sa.Text(), nullable=False),
+        sa.Column("options", postgresql.JSONB(), nullable=True),
+        sa.Column("correct_answer", sa.Text(), nullable=False),
         sa.Column("explanation", sa.Text(), nullable=True),
         sa.Column("distractors_explanation", sa.Text(), nullable=True),
-        sa.Column("topic", sa.String(200), nullable=True),
+        sa.Column("topic", sa.String(255), nullable=True),
         sa.Column("learning_objective", sa.Text(), nullable=True),
         sa.Column("source_content", sa.Text(), nullable=True),
         sa.Column("generation_prompt", sa.Text(), nullable=True),
         sa.Column("model_used", sa.String(100), nullable=True),
-        sa.Column("generation_metadata", sa.JSON(), nullable=True),
+        sa.Column("metadata", postgresql.JSONB(), nullable=True),
         sa.Column("quality_score", sa.Float(), nullable=True),
         sa.Column("evaluation_feedback", sa.JSON(), nullable=True),
         sa.Column("is_approved", sa.Boolean(), nullable=False, server_default="false"),
@@ -144,7 +147,7 @@ def upgrade() -> None:
 
     # Create indexes for performance
     op.create_index("idx_documents_status", "documents", ["processing_status"])
-    op.create_index("idx_documents_content_type", "documents", ["content_type"])
+    op.create_index("idx_documents_source_type", "documents", ["source_type"])
     op.create_index("idx_documents_created_at", "documents", ["created_at"])
 
     op.create_index("idx_chunks_document_id", "chunks", ["document_id"])
@@ -153,7 +156,7 @@ def upgrade() -> None:
     )
 
     op.create_index("idx_questions_document_id", "questions", ["document_id"])
-    op.create_index("idx_questions_difficulty", "questions", ["difficulty"])
+    op.create_index("idx_questions_difficulty", "questions", ["difficulty_level"])
     op.create_index("idx_questions_bloom_level", "questions", ["bloom_level"])
     op.create_index("idx_questions_quality_score", "questions", ["quality_score"])
     op.create_index("idx_questions_approved", "questions", ["is_approved"])
@@ -162,10 +165,10 @@ def upgrade() -> None:
 
     # Create GIN index for JSON columns
     op.create_index(
-        "idx_documents_metadata_gin", "documents", ["metadata_"], postgresql_using="gin"
+        "idx_documents_metadata_gin", "documents", ["metadata"], postgresql_using="gin"
     )
     op.create_index(
-        "idx_chunks_metadata_gin", "chunks", ["metadata_"], postgresql_using="gin"
+        "idx_chunks_metadata_gin", "chunks", ["metadata"], postgresql_using="gin"
     )
     op.create_index(
         "idx_questions_options_gin", "questions", ["options"], postgresql_using="gin"
@@ -173,7 +176,7 @@ def upgrade() -> None:
     op.create_index(
         "idx_questions_metadata_gin",
         "questions",
-        ["generation_metadata"],
+        ["metadata"],
         postgresql_using="gin",
     )
 
@@ -237,7 +240,7 @@ def downgrade() -> None:
     op.drop_index("idx_chunks_document_chunk", "chunks")
     op.drop_index("idx_chunks_document_id", "chunks")
     op.drop_index("idx_documents_created_at", "documents")
-    op.drop_index("idx_documents_content_type", "documents")
+    op.drop_index("idx_documents_source_type", "documents")
     op.drop_index("idx_documents_status", "documents")
 
     # Drop tables
@@ -0,0 +1,41 @@
+"""Add embedding cache table
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-12-20 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: str | None = "001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Create embedding cache table
+    op.create_table(
+        "embedding_cache",
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("embedding", postgresql.ARRAY(sa.Float), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.PrimaryKeyConstraint("content_hash", "provider", "model"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
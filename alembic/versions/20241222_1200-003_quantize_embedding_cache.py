@@ -0,0 +1,40 @@
+"""Store cached embeddings as int8
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-12-22 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: str | None = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Cached embeddings are regenerated on demand, so drop them rather than
+    # converting them
+    op.execute("DELETE FROM embedding_cache")
+    op.drop_column("embedding_cache", "embedding")
+    op.add_column(
+        "embedding_cache", sa.Column("embedding", sa.LargeBinary(), nullable=False)
+    )
+    op.add_column("embedding_cache", sa.Column("scale", sa.Float(), nullable=False))
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM embedding_cache")
+    op.drop_column("embedding_cache", "scale")
+    op.drop_column("embedding_cache", "embedding")
+    op.add_column(
+        "embedding_cache",
+        sa.Column("embedding", postgresql.ARRAY(sa.Float), nullable=False),
+    )
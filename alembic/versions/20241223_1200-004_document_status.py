@@ -0,0 +1,50 @@
+"""Rename the document processing status to status
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-12-23 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str | None = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Reuse the status column of the initial schema, keeping its values, so
+    # existing documents are not marked as ingested. States other than
+    # pending/completed/failed belong to jobs that no longer run; as failed
+    # they are retried when resubmitted
+    op.execute(
+        "UPDATE documents SET processing_status = 'failed' "
+        "WHERE processing_status NOT IN ('pending', 'completed', 'failed')"
+    )
+    op.alter_column(
+        "documents",
+        "processing_status",
+        new_column_name="status",
+        type_=sa.String(20),
+        existing_type=sa.String(50),
+        existing_nullable=False,
+        existing_server_default="pending",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "documents",
+        "status",
+        new_column_name="processing_status",
+        type_=sa.String(50),
+        existing_type=sa.String(20),
+        existing_nullable=False,
+        existing_server_default="pending",
+    )
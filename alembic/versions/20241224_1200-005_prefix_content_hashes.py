@@ -0,0 +1,65 @@
+"""Prefix content hashes with their algorithm
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-12-24 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str | None = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "documents",
+        "content_hash",
+        type_=sa.String(80),
+        existing_type=sa.String(64),
+        existing_nullable=False,
+    )
+    op.alter_column(
+        "embedding_cache",
+        "content_hash",
+        type_=sa.String(80),
+        existing_type=sa.String(64),
+        existing_nullable=False,
+    )
+
+    # Existing document hashes are unprefixed SHA-256 digests
+    op.execute(
+        "UPDATE documents SET content_hash = 'sha256:' || content_hash "
+        "WHERE content_hash NOT LIKE '%:%'"
+    )
+    # Cached embeddings are regenerated on demand
+    op.execute("DELETE FROM embedding_cache")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM embedding_cache")
+    op.execute(
+        "UPDATE documents SET content_hash = split_part(content_hash, ':', 2) "
+        "WHERE content_hash LIKE '%:%'"
+    )
+    op.alter_column(
+        "embedding_cache",
+        "content_hash",
+        type_=sa.String(64),
+        existing_type=sa.String(80),
+        existing_nullable=False,
+    )
+    op.alter_column(
+        "documents",
+        "content_hash",
+        type_=sa.String(64),
+        existing_type=sa.String(80),
+        existing_nullable=False,
+    )
@@ -9,6 +9,9 @@ from fastapi.responses import JSONResponse
 
 from ..core.config import settings
 from ..core.exceptions import DocumentIngestionError, QuickQuizException
+from ..utils.http_session import close_shared_session
+from ..utils.pdf_parser import PDFParser
+from ..utils.url_extractor import URLExtractor
 from .routes import evaluate, generate, ingest, questions
 
 # Configure logging
@@ -24,6 +27,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down QuickQuiz-GPT API")
+    await close_shared_session()
+    URLExtractor.shutdown_pool()
+    PDFParser.shutdown_pool()
 
 
 app = FastAPI(
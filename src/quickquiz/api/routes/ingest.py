@@ -1,16 +1,27 @@
 """Document ingestion API routes."""
 
+import logging
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    UploadFile,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.database import get_db
+from ...core.database import get_db, get_db_session
 from ...core.exceptions import DocumentIngestionError
 from ...models.schemas import (
     DocumentCreate,
     DocumentResponse,
+    DocumentStatus,
     IngestionRequest,
     IngestionResponse,
     SourceType,
@@ -18,6 +29,8 @@ from ...models.schemas import (
 from ...services.embeddings import EmbeddingService
 from ...services.ingestor import IngestionService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 
@@ -118,7 +131,8 @@ async def upload_document(
                         source_type=document.source_type,
                         source_url=document.source_url,
                         content_hash=document.content_hash,
-                        metadata=document.metadata,
+                        status=document.status,
+                        metadata=document.meta,
                         created_at=document.created_at,
                         updated_at=document.updated_at,
                     ),
@@ -189,7 +203,8 @@ async def ingest_from_url(
                 source_type=document.source_type,
                 source_url=document.source_url,
                 content_hash=document.content_hash,
-                metadata=document.metadata,
+                status=document.status,
+                metadata=document.meta,
                 created_at=document.created_at,
                 updated_at=document.updated_at,
             ),
@@ -209,13 +224,40 @@ async def ingest_from_url(
         )
 
 
+async def _ingest_chunks_in_background(
+    ingestion_service: IngestionService, document_id: uuid.UUID, content: str
+):
+    """Chunk and embed a queued document in its own database session.
+
+    On failure the document is marked failed, so resubmitting its content
+    ingests it again.
+    """
+
+    try:
+        async with get_db_session() as db:
+            await ingestion_service.ingest_document_chunks(db, document_id, content)
+    except Exception as e:
+        logger.error(f"Background ingestion of document {document_id} failed: {e}")
+        try:
+            async with get_db_session() as db:
+                await ingestion_service.mark_document_failed(db, document_id)
+        except Exception as e:
+            logger.error(f"Failed to mark document {document_id} as failed: {e}")
+
+
 @router.post("/ingest-text", response_model=IngestionResponse)
 async def ingest_text_content(
     request: IngestionRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     ingestion_service: IngestionService = Depends(get_ingestion_service),
 ):
-    """Ingest text content directly."""
+    """Ingest text content directly.
+
+    The document record is created right away with status 'pending'; its
+    chunks and embeddings are created in a background task after the
+    response is sent, which sets the status to 'completed' or 'failed'.
+    """
 
     if not request.content:
         raise HTTPException(
@@ -244,31 +286,44 @@ async def ingest_text_content(
             metadata=doc_metadata,
         )
 
-        # Ingest document
-        document = await ingestion_service.ingest_document(db, document_data)
-
-        # Count chunks
-        chunks_count = (
-            len(document.chunks)
-            if hasattr(document, "chunks") and document.chunks
-            else 0
+        # Create the document record, committed so the background task sees it
+        document, queued = await ingestion_service.create_text_document(
+            db, document_data
         )
+        await db.commit()
 
+        if queued:
+            background_tasks.add_task(
+                _ingest_chunks_in_background,
+                ingestion_service,
+                document.id,
+                request.content,
+            )
+
+        if queued:
+            job_status, message = "queued", "Text content queued for ingestion"
+        elif document.status == DocumentStatus.PENDING:
+            # Resubmitted while its first ingestion job is still running
+            job_status, message = "pending", "Text content is already being ingested"
+        else:
+            job_status, message = "completed", "Text content already ingested"
+
+        # The job is tracked by its document; poll /documents/{id}/status
         return IngestionResponse(
-            job_id=uuid.uuid4(),  # For future async processing
+            job_id=document.id,
             document=DocumentResponse(
                 id=document.id,
                 title=document.title,
                 source_type=document.source_type,
                 source_url=document.source_url,
                 content_hash=document.content_hash,
-                metadata=document.metadata,
+                status=document.status,
+                metadata=document.meta,
                 created_at=document.created_at,
                 updated_at=document.updated_at,
             ),
-            status="completed",
-            chunks_created=chunks_count,
-            message="Text content ingested successfully",
+            status=job_status,
+            message=message,
         )
 
     except DocumentIngestionError as e:
@@ -312,7 +367,8 @@ async def get_document_status(
             source_type=document.source_type,
             source_url=document.source_url,
             content_hash=document.content_hash,
-            metadata=document.metadata,
+            status=document.status,
+            metadata=document.meta,
             created_at=document.created_at,
             updated_at=document.updated_at,
         )
@@ -362,7 +418,8 @@ async def list_documents(
                 source_type=doc.source_type,
                 source_url=doc.source_url,
                 content_hash=doc.content_hash,
-                metadata=doc.metadata,
+                status=doc.status,
+                metadata=doc.meta,
                 created_at=doc.created_at,
                 updated_at=doc.updated_at,
             )
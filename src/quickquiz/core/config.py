@@ -1,5 +1,6 @@
 """Configuration management for QuickQuiz-GPT."""
 
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -39,26 +40,34 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 50
     allowed_file_types: list[str] = ["application/pdf"]
     upload_temp_dir: str = "/tmp"
+    pdf_parsing_processes: int | None = None  # None = one per CPU, 0 = threads
 
     # Text Processing
     chunk_size: int = 1000
     chunk_overlap: int = 200
     min_chunk_size: int = 100
     batch_size: int = 10
+    # Hash of document and chunk content used for deduplication and the
+    # embedding cache; changing it makes existing hashes stop matching.
+    # blake3 requires the speedups extra
+    content_hash_algorithm: Literal["sha256", "blake3"] = "sha256"
 
     # URL Extraction
     url_timeout: int = 30
     url_max_retries: int = 3
     url_user_agent: str = "QuickQuiz-GPT/1.0"
+    url_extraction_processes: int | None = None  # None = one per CPU, 0 = threads
 
     # Embedding Service
     embedding_dimension: int = 1536
     embedding_batch_size: int = 50
+    embedding_concurrency: int = 4  # Sub-batches in flight per document
 
     # Caching
     cache_ttl_documents: int = 86400  # 1 day
     cache_ttl_embeddings: int = 604800  # 1 week
     cache_ttl_questions: int = 3600  # 1 hour
+    cache_ttl_urls: int = 300  # 5 minutes
 
     # Rate Limiting
     rate_limit_requests_per_minute: int = 100
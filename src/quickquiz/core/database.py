@@ -5,6 +5,7 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.pool import NullPool, QueuePool
@@ -81,10 +82,14 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
             await session.commit()
-        except Exception as e:
+        except SQLAlchemyError as e:
             await session.rollback()
             logger.error(f"Database session error: {e}")
             raise DatabaseError(f"Database operation failed: {str(e)}") from e
+        except Exception:
+            # Errors raised by the caller, such as HTTP errors, pass through
+            await session.rollback()
+            raise
         finally:
             await session.close()
 
@@ -96,10 +101,14 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
             await session.commit()
-        except Exception as e:
+        except SQLAlchemyError as e:
             await session.rollback()
             logger.error(f"Database session error: {e}")
             raise DatabaseError(f"Database operation failed: {str(e)}") from e
+        except Exception:
+            # Errors raised by the caller, such as HTTP errors, pass through
+            await session.rollback()
+            raise
         finally:
             await session.close()
 
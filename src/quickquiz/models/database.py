@@ -4,16 +4,18 @@ import uuid
 
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
+    JSON,
     Boolean,
     Column,
     DateTime,
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     Text,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -25,12 +27,16 @@ class Document(Base):
 
     __tablename__ = "documents"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
     source_type = Column(String(50), nullable=False)  # 'pdf', 'url', 'text'
     source_url = Column(Text, nullable=True)
-    content_hash = Column(String(64), nullable=False, unique=True)
-    metadata = Column(JSON, nullable=True)
+    content_hash = Column(String(80), nullable=False, unique=True)  # "algo:hex"
+    # 'pending' until chunks and embeddings exist, then 'completed' or 'failed'
+    status = Column(
+        String(20), nullable=False, default="pending", server_default="pending"
+    )
+    meta = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -48,26 +54,40 @@ class DocumentChunk(Base):
 
     __tablename__ = "chunks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    document_id = Column(Uuid, ForeignKey("documents.id"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=True)  # OpenAI ada-002 embedding size
     token_count = Column(Integer, nullable=True)
-    metadata = Column(JSON, nullable=True)
+    meta = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     document = relationship("Document", back_populates="chunks")
 
 
+class EmbeddingCache(Base):
+    """Embedding cache model keyed by content hash, provider and model."""
+
+    __tablename__ = "embedding_cache"
+
+    content_hash = Column(String(80), primary_key=True)
+    provider = Column(String(50), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    # int8 components; multiply by scale to restore (see quantize_int8)
+    embedding = Column(LargeBinary, nullable=False)
+    scale = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Question(Base):
     """Question model for storing generated quiz questions."""
 
     __tablename__ = "questions"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    document_id = Column(Uuid, ForeignKey("documents.id"), nullable=False)
     question_text = Column(Text, nullable=False)
     question_type = Column(String(50), nullable=False, default="multiple_choice")
     options = Column(JSON, nullable=True)  # For multiple choice questions
@@ -83,7 +103,7 @@ class Question(Base):
     evaluation_feedback = Column(JSON, nullable=True)
 
     # Metadata
-    metadata = Column(JSON, nullable=True)
+    meta = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
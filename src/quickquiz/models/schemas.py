@@ -33,6 +33,14 @@ class SourceType(str, Enum):
     TEXT = "text"
 
 
+class DocumentStatus(str, Enum):
+    """Document ingestion status enumeration."""
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 # Base schemas
 class BaseSchema(BaseModel):
     """Base schema with common configurations."""
@@ -60,6 +68,7 @@ class DocumentResponse(BaseSchema):
     source_type: str
     source_url: Optional[str]
     content_hash: str
+    status: str
     metadata: Optional[dict[str, Any]]
     created_at: datetime
     updated_at: Optional[datetime]
@@ -1,15 +1,43 @@
 """Embedding service for generating text embeddings."""
 
+import asyncio
+from collections.abc import Sequence
 
+import numpy as np
 from openai import AsyncOpenAI
 
 from ..core.config import settings
 from ..core.exceptions import QuickQuizException
 
+# Maximum number of inputs OpenAI accepts in one embeddings request
+_MAX_BATCH_INPUTS = 2048
+
+
+def quantize_int8(vec: Sequence[float] | np.ndarray) -> tuple[bytes, float]:
+    """Quantize an embedding to int8 bytes and the scale that restores it.
+
+    Components are scaled by 127 / max|v|, which keeps cosine similarity
+    within about 1% at a quarter of the float32 size.
+    """
+
+    values = np.asarray(vec, dtype=np.float32)
+    max_abs = float(np.abs(values).max()) if values.size else 0.0
+    scale = max_abs / 127 if max_abs else 1.0
+
+    quantized = np.rint(values / scale).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def dequantize_int8(data: bytes, scale: float) -> np.ndarray:
+    """Restore a float32 embedding from `quantize_int8` output."""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale)
+
 
 class EmbeddingService:
     """Service for generating text embeddings using OpenAI."""
 
+    provider_name = "openai"
+
     def __init__(self):
         self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = "text-embedding-ada-002"
@@ -32,7 +60,11 @@ class EmbeddingService:
     async def generate_embeddings_batch(
         self, texts: list[str]
     ) -> list[list[float] | None]:
-        """Generate embeddings for multiple texts in batch."""
+        """Generate embeddings for multiple texts in batch.
+
+        Texts are sent in as few requests as the provider's input limit
+        allows, and those requests run concurrently.
+        """
 
         try:
             # Filter out empty texts
@@ -41,11 +73,19 @@ class EmbeddingService:
             if not non_empty_texts:
                 return [None] * len(texts)
 
-            response = await self.client.embeddings.create(
-                model=self.model, input=non_empty_texts
+            responses = await asyncio.gather(
+                *(
+                    self.client.embeddings.create(
+                        model=self.model,
+                        input=non_empty_texts[i : i + _MAX_BATCH_INPUTS],
+                    )
+                    for i in range(0, len(non_empty_texts), _MAX_BATCH_INPUTS)
+                )
             )
 
-            embeddings = [data.embedding for data in response.data]
+            embeddings = [
+                data.embedding for response in responses for data in response.data
+            ]
 
             # Map back to original positions
             result = []
@@ -59,7 +59,7 @@ class GeneratorService:
                         difficulty_level=question.get("difficulty_level"),
                         bloom_level=question.get("bloom_level"),
                         topic=question.get("topic"),
-                        metadata={"generation_request_id": str(uuid.uuid4())},
+                        meta={"generation_request_id": str(uuid.uuid4())},
                     )
 
                     db.add(question_record)
@@ -1,27 +1,50 @@
 """Document ingestion service."""
 
+import asyncio
 import hashlib
 import logging
+import uuid
+from collections.abc import Iterable, Sequence
 from typing import Optional
 
+import numpy as np
+
 try:
-    from sqlalchemy import select
+    from sqlalchemy import Insert, delete, select, update
+    from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
     from sqlalchemy.ext.asyncio import AsyncSession
 except ImportError:
     # Fallback for development
-    select = None
+    Insert = delete = select = update = None
+    postgresql_insert = sqlite_insert = None
     AsyncSession = None
 
+try:
+    import blake3
+except ImportError:
+    # Optional dependency; required when content_hash_algorithm is "blake3"
+    blake3 = None
+
+from ..core.config import settings
 from ..core.exceptions import DocumentIngestionError
-from ..models.database import Document, DocumentChunk
-from ..models.schemas import DocumentCreate, SourceType
+from ..models.database import Document, DocumentChunk, EmbeddingCache
+from ..models.schemas import DocumentCreate, DocumentStatus, SourceType
 from ..utils.pdf_parser import PDFParser
 from ..utils.text_processor import TextProcessor
 from ..utils.url_extractor import URLExtractor
-from .embeddings import EmbeddingService
+from .embeddings import EmbeddingService, dequantize_int8, quantize_int8
 
 logger = logging.getLogger(__name__)
 
+# Chunks per embedding request; sub-batches are embedded concurrently, up to
+# `embedding_concurrency` at a time
+_EMBEDDING_BATCH_SIZE = 64
+
+# Embeddings are lists of floats or float32 arrays (as pgvector loads them);
+# Vector columns accept either without conversion
+Embedding = Sequence[float] | np.ndarray
+
 
 class IngestionService:
     """Service for ingesting documents and creating embeddings."""
@@ -53,36 +76,26 @@ class IngestionService:
 
             # Check if document already exists
             existing_doc = await self._find_existing_document(db, content_hash)
-            if existing_doc:
+            if existing_doc and not await self._requeue_failed_document(
+                db, existing_doc.id
+            ):
+                # Completed, or pending while another ingestion is running
                 logger.info(f"Document already exists with ID: {existing_doc.id}")
                 return existing_doc
 
-            # Create document record
-            document = Document(
-                title=document_data.title,
-                source_type=document_data.source_type.value,
-                source_url=str(document_data.source_url)
-                if document_data.source_url
-                else None,
-                content_hash=content_hash,
-                metadata=document_data.metadata or {},
-            )
-
-            db.add(document)
-            await db.flush()  # Get the document ID
-            logger.info(f"Created document record with ID: {document.id}")
-
-            # Process content into chunks
-            chunks = await self._create_chunks(content)
-            logger.info(f"Created {len(chunks)} chunks")
-
-            if not chunks:
-                raise DocumentIngestionError("No valid chunks created from content")
+            if existing_doc:
+                # An earlier ingestion failed; redo it
+                logger.info(f"Re-ingesting failed document: {existing_doc.id}")
+                document = existing_doc
+                await self._delete_chunks(db, document.id)
+            else:
+                # Create document record
+                document = await self._add_document(db, document_data, content_hash)
 
-            # Create embeddings for chunks
-            await self._create_chunk_embeddings(db, document.id, chunks)
-            logger.info(f"Generated embeddings for {len(chunks)} chunks")
+            # Process content into chunks with embeddings
+            await self._chunk_and_embed(db, document.id, content)
 
+            document.status = DocumentStatus.COMPLETED.value
             await db.commit()
             logger.info(f"Successfully ingested document: {document.id}")
             return document
@@ -95,6 +108,151 @@ class IngestionService:
             logger.error(f"Unexpected error during document ingestion: {e}")
             raise DocumentIngestionError(f"Failed to ingest document: {str(e)}")
 
+    async def create_text_document(
+        self, db: AsyncSession, document_data: DocumentCreate
+    ) -> tuple[Document, bool]:
+        """Create the pending record of a text document without chunking it.
+
+        Returns the record and whether its chunks still have to be created
+        with `ingest_document_chunks`. A failed document with the same
+        content is reset to pending so it is ingested again; a completed or
+        pending one is returned as is, since a pending document already has
+        an ingestion job running.
+        """
+
+        content = await self._extract_text_content(document_data)
+        if len(content.strip()) < 50:
+            raise DocumentIngestionError(
+                "Extracted content is too short (minimum 50 characters required)"
+            )
+
+        content_hash = self._create_content_hash(content)
+        document = await self._find_existing_document(db, content_hash)
+        if document and not await self._requeue_failed_document(db, document.id):
+            logger.info(f"Document already exists with ID: {document.id}")
+            return document, False
+
+        if document:
+            logger.info(f"Re-queueing failed document: {document.id}")
+        else:
+            document = await self._add_document(
+                db, document_data, content_hash, status=DocumentStatus.PENDING
+            )
+
+        # Load server-side defaults such as created_at
+        await db.refresh(document)
+        return document, True
+
+    async def ingest_document_chunks(
+        self, db: AsyncSession, document_id: uuid.UUID, content: str
+    ) -> None:
+        """Create the chunks of a pending document and mark it completed.
+
+        Chunks left by an earlier attempt are replaced, so the ingestion of
+        a document can safely be retried.
+        """
+
+        logger.info(f"Starting chunk ingestion for document: {document_id}")
+
+        try:
+            await self._delete_chunks(db, document_id)
+            await self._chunk_and_embed(db, document_id, content)
+            await self._set_status(db, document_id, DocumentStatus.COMPLETED)
+            await db.commit()
+            logger.info(f"Successfully ingested document: {document_id}")
+
+        except DocumentIngestionError:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Unexpected error during chunk ingestion: {e}")
+            raise DocumentIngestionError(
+                f"Failed to ingest document chunks: {str(e)}"
+            ) from e
+
+    async def mark_document_failed(
+        self, db: AsyncSession, document_id: uuid.UUID
+    ) -> None:
+        """Mark a document whose ingestion failed, so it is retried later."""
+
+        await self._set_status(db, document_id, DocumentStatus.FAILED)
+        await db.commit()
+        logger.info(f"Marked document as failed: {document_id}")
+
+    async def _set_status(
+        self, db: AsyncSession, document_id: uuid.UUID, status: DocumentStatus
+    ) -> None:
+        """Set the ingestion status of a document."""
+        await db.execute(
+            update(Document)
+            .where(Document.id == document_id)
+            .values(status=status.value)
+        )
+
+    async def _requeue_failed_document(
+        self, db: AsyncSession, document_id: uuid.UUID
+    ) -> bool:
+        """Reset a failed document to pending, returning whether it was failed.
+
+        The status is checked and changed in one UPDATE, so of several
+        concurrent resubmissions only one re-queues the document.
+        """
+        result = await db.execute(
+            update(Document)
+            .where(
+                Document.id == document_id,
+                Document.status == DocumentStatus.FAILED.value,
+            )
+            .values(status=DocumentStatus.PENDING.value)
+        )
+        return result.rowcount == 1
+
+    async def _delete_chunks(self, db: AsyncSession, document_id: uuid.UUID) -> None:
+        """Delete the chunks of a document."""
+        await db.execute(
+            delete(DocumentChunk).where(DocumentChunk.document_id == document_id)
+        )
+
+    async def _add_document(
+        self,
+        db: AsyncSession,
+        document_data: DocumentCreate,
+        content_hash: str,
+        status: DocumentStatus = DocumentStatus.PENDING,
+    ) -> Document:
+        """Add and flush the record of a new document."""
+
+        document = Document(
+            title=document_data.title,
+            source_type=document_data.source_type.value,
+            source_url=str(document_data.source_url)
+            if document_data.source_url
+            else None,
+            content_hash=content_hash,
+            status=status.value,
+            meta=document_data.metadata or {},
+        )
+
+        db.add(document)
+        await db.flush()  # Get the document ID
+        logger.info(f"Created document record with ID: {document.id}")
+        return document
+
+    async def _chunk_and_embed(
+        self, db: AsyncSession, document_id: uuid.UUID, content: str
+    ) -> None:
+        """Split content into chunks and create their records with embeddings."""
+
+        chunks = await self._create_chunks(content)
+        logger.info(f"Created {len(chunks)} chunks")
+
+        if not chunks:
+            raise DocumentIngestionError("No valid chunks created from content")
+
+        await self._create_chunk_embeddings(db, document_id, chunks)
+        logger.info(f"Generated embeddings for {len(chunks)} chunks")
+
     async def _extract_content(self, document_data: DocumentCreate) -> str:
         """Extract content from different source types."""
         try:
@@ -116,7 +274,7 @@ class IngestionService:
 
     async def _extract_text_content(self, document_data: DocumentCreate) -> str:
         """Extract content from text source."""
-        if not document_data.content:
+        if document_data.content is None:
             raise DocumentIngestionError("Content is required for text source type")
         return document_data.content
 
@@ -158,8 +316,24 @@ class IngestionService:
             logger.warning(f"Failed to extract metadata from URL: {e}")
 
     def _create_content_hash(self, content: str) -> str:
-        """Create a hash of the content for deduplication."""
-        return hashlib.sha256(content.encode()).hexdigest()
+        """Create a hash of the content for deduplication.
+
+        The digest is prefixed with its algorithm, set by
+        `content_hash_algorithm`, so hashes made with different algorithms
+        never match each other.
+        """
+
+        algorithm = settings.content_hash_algorithm
+        if algorithm == "blake3":
+            if blake3 is None:
+                raise DocumentIngestionError(
+                    "content_hash_algorithm is 'blake3' but blake3 is not installed"
+                )
+            digest = blake3.blake3(content.encode()).hexdigest()
+        else:
+            digest = hashlib.sha256(content.encode()).hexdigest()
+
+        return f"{algorithm}:{digest}"
 
     async def _find_existing_document(
         self, db: AsyncSession, content_hash: str
@@ -178,55 +352,202 @@ class IngestionService:
         return await self.text_processor.chunk_text(content)
 
     async def _create_chunk_embeddings(
-        self, db: AsyncSession, document_id: str, chunks: list[str]
-    ):
-        """Create chunk records with embeddings."""
+        self, db: AsyncSession, document_id: uuid.UUID, chunks: list[str]
+    ) -> None:
+        """Create chunk records with embeddings.
+
+        Chunks missing from the embedding cache are embedded in concurrent
+        sub-batches, at most `embedding_concurrency` at a time, and the
+        records of each sub-batch are inserted as soon as its embeddings
+        arrive, so API latency overlaps the inserts. If any sub-batch fails,
+        the ones still waiting or in flight are cancelled.
+        """
+
+        # Reuse embeddings of chunks seen before, so only new text is embedded
+        chunk_hashes = [self._create_content_hash(chunk) for chunk in chunks]
+        cached_embeddings = await self._find_cached_embeddings(db, chunk_hashes)
+
+        # Chunk indexes per uncached hash; repeated chunks are embedded once
+        pending: dict[str, list[int]] = {}
+        for chunk_index, chunk_hash in enumerate(chunk_hashes):
+            if chunk_hash not in cached_embeddings:
+                pending.setdefault(chunk_hash, []).append(chunk_index)
+
+        semaphore = asyncio.Semaphore(settings.embedding_concurrency)
+
+        async def embed_batch(
+            batch_hashes: list[str],
+        ) -> tuple[list[str], Iterable[Embedding | None]]:
+            async with semaphore:
+                return await self._embed_batch(
+                    batch_hashes, [chunks[pending[h][0]] for h in batch_hashes]
+                )
 
-        # Process chunks in batches for better performance
-        batch_size = 10
+        miss_hashes = list(pending)
+        tasks = [
+            asyncio.create_task(embed_batch(batch_hashes))
+            for batch_hashes in (
+                miss_hashes[i : i + _EMBEDDING_BATCH_SIZE]
+                for i in range(0, len(miss_hashes), _EMBEDDING_BATCH_SIZE)
+            )
+        ]
 
-        for i in range(0, len(chunks), batch_size):
-            batch_chunks = chunks[i : i + batch_size]
+        try:
+            # Chunks with cached embeddings are inserted while the API works
+            await self._add_chunk_records(
+                db,
+                document_id,
+                chunks,
+                chunk_hashes,
+                [i for i, h in enumerate(chunk_hashes) if h not in pending],
+                cached_embeddings,
+            )
 
-            try:
-                # Generate embeddings for batch
-                embeddings = await self.embedding_service.generate_embeddings_batch(
-                    batch_chunks
+            for task in asyncio.as_completed(tasks):
+                batch_hashes, embeddings = await task
+                await self._cache_embeddings(
+                    db, batch_hashes, embeddings, cached_embeddings
+                )
+                await self._add_chunk_records(
+                    db,
+                    document_id,
+                    chunks,
+                    chunk_hashes,
+                    [i for h in batch_hashes for i in pending[h]],
+                    cached_embeddings,
                 )
 
-                # Create chunk records
-                for j, (chunk_content, embedding) in enumerate(
-                    zip(batch_chunks, embeddings, strict=False)
-                ):
-                    chunk_index = i + j
-
-                    # Estimate token count more accurately
-                    token_count = self.text_processor.estimate_tokens(chunk_content)
-
-                    chunk = DocumentChunk(
-                        document_id=document_id,
-                        chunk_index=chunk_index,
-                        content=chunk_content,
-                        embedding=embedding,
-                        token_count=token_count,
-                        metadata={
-                            "chunk_type": "text",
-                            "batch_index": i // batch_size,
-                            "content_length": len(chunk_content),
-                        },
-                    )
-
-                    db.add(chunk)
-
-                # Flush after each batch to avoid memory issues
-                await db.flush()
-                logger.debug(f"Processed batch {i // batch_size + 1} of chunks")
-
-            except Exception as e:
-                logger.error(
-                    f"Error processing chunk batch {i}-{i + len(batch_chunks)}: {e}"
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            logger.error(f"Error processing chunk batch: {e}")
+            raise DocumentIngestionError(
+                f"Failed to process chunk batch: {str(e)}"
+            ) from e
+
+    async def _add_chunk_records(
+        self,
+        db: AsyncSession,
+        document_id: uuid.UUID,
+        chunks: list[str],
+        chunk_hashes: list[str],
+        chunk_indexes: list[int],
+        embeddings: dict[str, Embedding],
+    ) -> None:
+        """Insert the records of the given chunks and flush them."""
+
+        if not chunk_indexes:
+            return
+
+        records = []
+        for chunk_index in chunk_indexes:
+            chunk_content = chunks[chunk_index]
+
+            # Estimate token count more accurately
+            token_count = self.text_processor.estimate_tokens(chunk_content)
+
+            records.append(
+                DocumentChunk(
+                    document_id=document_id,
+                    chunk_index=chunk_index,
+                    content=chunk_content,
+                    embedding=embeddings.get(chunk_hashes[chunk_index]),
+                    token_count=token_count,
+                    meta={
+                        "chunk_type": "text",
+                        "batch_index": chunk_index // _EMBEDDING_BATCH_SIZE,
+                        "content_length": len(chunk_content),
+                    },
                 )
-                raise DocumentIngestionError(f"Failed to process chunk batch: {str(e)}")
+            )
+
+        db.add_all(records)
+
+        # Flush after each batch to avoid memory issues
+        await db.flush()
+        logger.debug(f"Inserted {len(records)} chunk records")
+
+    async def _find_cached_embeddings(
+        self, db: AsyncSession, chunk_hashes: list[str]
+    ) -> dict[str, Embedding]:
+        """Look up cached embeddings for the given chunk hashes.
+
+        The lookup runs in a savepoint, so a failed lookup falls back to
+        embedding every chunk without aborting the surrounding transaction.
+        """
+        try:
+            stmt = select(
+                EmbeddingCache.content_hash,
+                EmbeddingCache.embedding,
+                EmbeddingCache.scale,
+            ).where(
+                EmbeddingCache.provider == self.embedding_service.provider_name,
+                EmbeddingCache.model == self.embedding_service.model,
+                EmbeddingCache.content_hash.in_(set(chunk_hashes)),
+            )
+            async with db.begin_nested():
+                result = await db.execute(stmt)
+                rows = result.all()
+            return {
+                chunk_hash: dequantize_int8(data, scale)
+                for chunk_hash, data, scale in rows
+            }
+        except Exception as e:
+            logger.warning(f"Error looking up cached embeddings: {e}")
+            return {}
+
+    async def _embed_batch(
+        self, chunk_hashes: list[str], chunks: list[str]
+    ) -> tuple[list[str], Iterable[Embedding | None]]:
+        """Embed a sub-batch of chunks, returning their hashes alongside."""
+
+        embeddings = await self.embedding_service.generate_embeddings_batch(chunks)
+        return chunk_hashes, embeddings
+
+    async def _cache_embeddings(
+        self,
+        db: AsyncSession,
+        chunk_hashes: list[str],
+        embeddings: Iterable[Embedding | None],
+        cached_embeddings: dict[str, Embedding],
+    ) -> None:
+        """Add new embeddings to the cache table and to `cached_embeddings`.
+
+        Entries another ingestion cached in the meantime are left as they
+        are instead of failing the insert.
+        """
+
+        rows = []
+        for chunk_hash, embedding in zip(chunk_hashes, embeddings, strict=False):
+            if embedding is None:
+                continue
+            cached_embeddings[chunk_hash] = embedding
+            data, scale = quantize_int8(embedding)
+            rows.append(
+                {
+                    "content_hash": chunk_hash,
+                    "provider": self.embedding_service.provider_name,
+                    "model": self.embedding_service.model,
+                    "embedding": data,
+                    "scale": scale,
+                }
+            )
+
+        if not rows:
+            return
+
+        # ON CONFLICT DO NOTHING is dialect-specific, so each branch builds its
+        # statement with its own dialect's insert
+        stmt: Insert
+        if db.get_bind().dialect.name == "sqlite":
+            stmt = sqlite_insert(EmbeddingCache).values(rows).on_conflict_do_nothing()
+        else:
+            stmt = (
+                postgresql_insert(EmbeddingCache).values(rows).on_conflict_do_nothing()
+            )
+        await db.execute(stmt)
 
     async def get_document_status(
         self, db: AsyncSession, document_id: str
@@ -0,0 +1,66 @@
+"""Process-wide HTTP session shared by the URL and PDF fetchers."""
+
+import asyncio
+
+import aiohttp
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# Requests to one origin queue onto this many keep-alive connections instead
+# of opening a new connection (and TLS handshake) per concurrent request
+_CONNECTIONS_PER_HOST = 8
+
+# Process-wide HTTP session so connection pooling, keep-alive connections and
+# the DNS cache are reused across URL extractor and PDF parser instances
+_SHARED_SESSION: aiohttp.ClientSession | None = None
+_SHARED_SESSION_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session, creating it on first use."""
+
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+
+    loop = asyncio.get_running_loop()
+    if (
+        _SHARED_SESSION is None
+        or _SHARED_SESSION.closed
+        or _SHARED_SESSION_LOOP is not loop
+    ):
+        _SHARED_SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=_CONNECTIONS_PER_HOST,
+                # Resolve on the event loop via aiodns instead of the thread
+                # pool when it is installed
+                resolver=aiohttp.AsyncResolver() if aiodns is not None else None,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            # aiohttp advertises gzip and deflate, plus br when Brotli is
+            # installed, and decompresses responses transparently
+            headers={"User-Agent": _USER_AGENT},
+        )
+        _SHARED_SESSION_LOOP = loop
+
+    return _SHARED_SESSION
+
+
+async def close_shared_session() -> None:
+    """Close the shared HTTP session."""
+
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+
+    if _SHARED_SESSION is not None:
+        await _SHARED_SESSION.close()
+    _SHARED_SESSION = None
+    _SHARED_SESSION_LOOP = None
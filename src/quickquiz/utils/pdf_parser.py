@@ -1,33 +1,206 @@
 """PDF parsing utilities."""
 
+import asyncio
+import io
+import multiprocessing
 import os
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import aiohttp
 import pdfplumber
 import trafilatura
 
+from ..core.config import settings
 from ..core.exceptions import DocumentIngestionError
+from .http_session import get_shared_session
+
+# PDFs larger than this are parsed in a worker process rather than a thread,
+# so pdfplumber's pure-Python layout analysis does not hold the GIL the
+# event loop needs
+_PROCESS_PARSE_MIN_BYTES = 1024 * 1024
+
+_PARSE_POOL: ProcessPoolExecutor | None = None
+
+# Downloads are streamed to disk in chunks of this size
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _get_parse_pool() -> ProcessPoolExecutor | None:
+    """Get the PDF parsing process pool, starting it on first use.
+
+    Returns None when `pdf_parsing_processes` is 0, in which case all PDFs
+    are parsed in a worker thread instead.
+    """
+
+    global _PARSE_POOL
+
+    if settings.pdf_parsing_processes == 0:
+        return None
+    if _PARSE_POOL is None:
+        # Forking would copy the event loop, open sockets and locks held by
+        # other threads into the workers, so they are spawned fresh instead
+        _PARSE_POOL = ProcessPoolExecutor(
+            max_workers=settings.pdf_parsing_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _PARSE_POOL
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut down a broken parsing pool so the next call starts a new one."""
+
+    global _PARSE_POOL
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Another call may already have replaced the broken pool
+    if _PARSE_POOL is pool:
+        _PARSE_POOL = None
+
+
+def _clean_page_text(text: str) -> str:
+    """Clean and format extracted text."""
+
+    if not text:
+        return ""
+
+    # Basic text cleaning
+    lines = text.split("\n")
+    cleaned_lines = []
+
+    for line in lines:
+        # Remove excessive whitespace
+        cleaned_line = " ".join(line.split())
+
+        # Skip very short lines (likely artifacts)
+        if len(cleaned_line) > 3:
+            cleaned_lines.append(cleaned_line)
+
+    # Join lines with appropriate spacing
+    result = "\n".join(cleaned_lines)
+
+    # Remove excessive newlines
+    while "\n\n\n" in result:
+        result = result.replace("\n\n\n", "\n\n")
+
+    return result.strip()
+
+
+def _extract_pdf_text(source: str | bytes) -> str:
+    """Extract text from a PDF file path or PDF bytes using pdfplumber.
+
+    This is blocking, CPU-bound work; callers run it in a worker thread or
+    process.
+    """
+
+    text_content = []
+
+    with pdfplumber.open(
+        io.BytesIO(source) if isinstance(source, bytes) else source
+    ) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            try:
+                # Extract text from page
+                page_text = page.extract_text()
+
+                if page_text:
+                    # Clean and format the text
+                    cleaned_text = _clean_page_text(page_text)
+                    if cleaned_text.strip():
+                        text_content.append(
+                            f"<!-- Page {page_num + 1} -->\n{cleaned_text}"
+                        )
+
+            except Exception as e:
+                # Log warning but continue with other pages
+                print(
+                    f"Warning: Failed to extract text from page {page_num + 1}: {str(e)}"
+                )
+                continue
+
+    if not text_content:
+        raise DocumentIngestionError("No text content extracted from PDF")
+
+    return "\n\n".join(text_content)
+
+
+async def _parse_off_loop(source: str | bytes, size: int) -> str:
+    """Run _extract_pdf_text on a PDF file path or PDF bytes of `size` bytes.
+
+    Parsing runs in a worker thread, or a worker process for large PDFs, so
+    the event loop keeps serving other requests meanwhile. A worker that
+    dies breaks the whole pool, so the broken pool is replaced and the PDF
+    retried once.
+    """
+
+    if size <= _PROCESS_PARSE_MIN_BYTES:
+        return await asyncio.to_thread(_extract_pdf_text, source)
+
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = _get_parse_pool()
+        if pool is None:
+            break
+        try:
+            return await loop.run_in_executor(pool, _extract_pdf_text, source)
+        except BrokenProcessPool:
+            _discard_parse_pool(pool)
+            if attempt:
+                raise
+    return await asyncio.to_thread(_extract_pdf_text, source)
 
 
 class PDFParser:
     """Service for parsing PDF documents and web content."""
 
+    def __init__(self, session: aiohttp.ClientSession | None = None):
+        self.session = session
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the injected HTTP session, or else the shared one."""
+        if self.session is not None:
+            return self.session
+        return await get_shared_session()
+
     async def extract_from_url(self, url: str) -> str:
         """Extract text from a PDF URL."""
 
         try:
-            # Download PDF from URL
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        raise DocumentIngestionError(
-                            f"Failed to download PDF: HTTP {response.status}"
-                        )
+            # Download PDF from URL over the pooled session
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise DocumentIngestionError(
+                        f"Failed to download PDF: HTTP {response.status}"
+                    )
 
-                    pdf_content = await response.read()
+                max_bytes = settings.max_file_size_mb * 1024 * 1024
+                content_length = response.headers.get("content-length", "")
+                if content_length.isdigit() and int(content_length) > max_bytes:
+                    raise DocumentIngestionError(
+                        f"PDF too large ({content_length} bytes), the limit is "
+                        f"{settings.max_file_size_mb} MB"
+                    )
 
-            return await self.extract_from_bytes(pdf_content)
+                # Stream the PDF to a temporary file rather than buffering it
+                # in memory, so memory use does not grow with the file size.
+                # The length header may be missing or wrong, so bytes are
+                # counted as they arrive too
+                with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+                    downloaded = 0
+                    async for chunk in response.content.iter_chunked(
+                        _DOWNLOAD_CHUNK_SIZE
+                    ):
+                        downloaded += len(chunk)
+                        if downloaded > max_bytes:
+                            raise DocumentIngestionError(
+                                f"PDF exceeds the {settings.max_file_size_mb} MB limit"
+                            )
+                        pdf_file.write(chunk)
+                    pdf_file.flush()
+
+                    return await self.extract_from_file(pdf_file.name)
 
         except aiohttp.ClientError as e:
             raise DocumentIngestionError(f"Failed to download PDF: {str(e)}")
@@ -40,15 +213,15 @@ class PDFParser:
         """Extract text content from a web URL using trafilatura."""
 
         try:
-            # Download the webpage
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        raise DocumentIngestionError(
-                            f"Failed to download webpage: HTTP {response.status}"
-                        )
+            # Download the webpage over the pooled session
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status != 200:
+                    raise DocumentIngestionError(
+                        f"Failed to download webpage: HTTP {response.status}"
+                    )
 
-                    html_content = await response.text()
+                html_content = await response.text()
 
             # Extract main content using trafilatura
             extracted_text = trafilatura.extract(
@@ -136,18 +309,7 @@ class PDFParser:
         """Extract text from PDF bytes."""
 
         try:
-            # Create a temporary file to work with pdfplumber
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
-                tmp_file.write(pdf_bytes)
-                tmp_file.flush()
-
-                text = await self._extract_text_from_file(tmp_file.name)
-
-                # Clean up temporary file
-                os.unlink(tmp_file.name)
-
-                return text
-
+            return await _parse_off_loop(pdf_bytes, len(pdf_bytes))
         except Exception as e:
             raise DocumentIngestionError(
                 f"Failed to extract text from PDF bytes: {str(e)}"
@@ -157,66 +319,17 @@ class PDFParser:
         """Extract text from a PDF file path."""
 
         try:
-            return await self._extract_text_from_file(file_path)
+            return await _parse_off_loop(file_path, os.path.getsize(file_path))
         except Exception as e:
             raise DocumentIngestionError(
                 f"Failed to extract text from PDF file: {str(e)}"
             )
 
-    async def _extract_text_from_file(self, file_path: str) -> str:
-        """Extract text from PDF file using pdfplumber."""
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """Shut down the PDF parsing process pool."""
+        global _PARSE_POOL
 
-        text_content = []
-
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                try:
-                    # Extract text from page
-                    page_text = page.extract_text()
-
-                    if page_text:
-                        # Clean and format the text
-                        cleaned_text = self._clean_page_text(page_text)
-                        if cleaned_text.strip():
-                            text_content.append(
-                                f"<!-- Page {page_num + 1} -->\n{cleaned_text}"
-                            )
-
-                except Exception as e:
-                    # Log warning but continue with other pages
-                    print(
-                        f"Warning: Failed to extract text from page {page_num + 1}: {str(e)}"
-                    )
-                    continue
-
-        if not text_content:
-            raise DocumentIngestionError("No text content extracted from PDF")
-
-        return "\n\n".join(text_content)
-
-    def _clean_page_text(self, text: str) -> str:
-        """Clean and format extracted text."""
-
-        if not text:
-            return ""
-
-        # Basic text cleaning
-        lines = text.split("\n")
-        cleaned_lines = []
-
-        for line in lines:
-            # Remove excessive whitespace
-            cleaned_line = " ".join(line.split())
-
-            # Skip very short lines (likely artifacts)
-            if len(cleaned_line) > 3:
-                cleaned_lines.append(cleaned_line)
-
-        # Join lines with appropriate spacing
-        result = "\n".join(cleaned_lines)
-
-        # Remove excessive newlines
-        while "\n\n\n" in result:
-            result = result.replace("\n\n\n", "\n\n")
-
-        return result.strip()
+        if _PARSE_POOL is not None:
+            _PARSE_POOL.shutdown(cancel_futures=True)
+        _PARSE_POOL = None
@@ -1,7 +1,38 @@
 """Prompt templates for LLM interactions."""
 
+import json
 from typing import Any
 
+# Static question generation instructions, independent of context, difficulty,
+# question type and topic so it can be cached as a prompt prefix.
+_QGEN_STATIC_HEADER = """
+You are an expert educational content creator. Generate a high-quality quiz question based on the provided context.
+
+General requirements:
+- Question should test understanding, not just memorization
+- Include clear, unambiguous answer options (A, B, C, D)
+- Provide a detailed explanation for the correct answer
+- Classify according to Bloom's taxonomy
+- Match the difficulty and question type requested below
+
+Response format (JSON):
+{
+    "question_text": "Clear, specific question text",
+    "question_type": "The requested question type",
+    "options": [
+        {"label": "A", "text": "First option"},
+        {"label": "B", "text": "Second option"},
+        {"label": "C", "text": "Third option"},
+        {"label": "D", "text": "Fourth option"}
+    ],
+    "correct_answer": "A",
+    "explanation": "Detailed explanation of why this is correct",
+    "difficulty_level": "The requested difficulty",
+    "bloom_level": "Remember|Understand|Apply|Analyze|Evaluate|Create",
+    "topic": "Main topic covered"
+}
+"""
+
 
 class PromptTemplates:
     """Collection of prompt templates for question generation and evaluation."""
@@ -15,42 +46,51 @@ class PromptTemplates:
     ) -> str:
         """Generate prompt for question generation."""
 
-        topic_instruction = f" Focus on the topic: {topic}." if topic else ""
+        return self.join_prompt_blocks(
+            self.get_question_generation_prompt_blocks(
+                context, difficulty, question_type, topic
+            )
+        )
 
-        prompt = f"""
-You are an expert educational content creator. Generate a high-quality {difficulty} difficulty {question_type} question based on the provided context.
+    def get_question_generation_prompt_blocks(
+        self,
+        context: str,
+        difficulty: str = "medium",
+        question_type: str = "multiple_choice",
+        topic: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Generate question generation prompt as cacheable content blocks.
+
+        The first block is the static instruction header, marked with
+        `cache_control` so providers supporting prompt caching can reuse it
+        across calls. The second block carries the per-call context and
+        requirements.
+        """
 
+        topic_instruction = f"\n- Focus on the topic: {topic}" if topic else ""
+
+        dynamic_text = f"""
 Context:
 {context}
 
-Requirements:
-- Create a {difficulty} difficulty question
-- Question type: {question_type}
-- Question should test understanding, not just memorization
-- Include clear, unambiguous answer options (A, B, C, D)
-- Provide a detailed explanation for the correct answer
-- Classify according to Bloom's taxonomy{topic_instruction}
-
-Response format (JSON):
-{{
-    "question_text": "Clear, specific question text",
-    "question_type": "{question_type}",
-    "options": [
-        {{"label": "A", "text": "First option"}},
-        {{"label": "B", "text": "Second option"}},
-        {{"label": "C", "text": "Third option"}},
-        {{"label": "D", "text": "Fourth option"}}
-    ],
-    "correct_answer": "A",
-    "explanation": "Detailed explanation of why this is correct",
-    "difficulty_level": "{difficulty}",
-    "bloom_level": "Remember|Understand|Apply|Analyze|Evaluate|Create",
-    "topic": "Main topic covered"
-}}
+Requirements for this question:
+- Difficulty: {difficulty}
+- Question type: {question_type}{topic_instruction}
 
 Generate one high-quality question:
 """
-        return prompt
+        return [
+            {
+                "type": "text",
+                "text": _QGEN_STATIC_HEADER,
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": dynamic_text},
+        ]
+
+    def join_prompt_blocks(self, blocks: list[dict[str, Any]]) -> str:
+        """Flatten prompt content blocks into a single prompt string."""
+        return "".join(block["text"] for block in blocks)
 
     def get_evaluation_prompt(
         self,
@@ -212,3 +252,136 @@ Response format (JSON):
 Generate {num_questions} questions:
 """
         return prompt
+
+    def get_batched_question_generation_prompt(
+        self,
+        contexts: list[str],
+        n_per_context: int = 1,
+        difficulty: str = "medium",
+        question_type: str = "multiple_choice",
+        topic: str | None = None,
+    ) -> str:
+        """Generate one prompt asking for questions on several contexts at once.
+
+        Contexts are numbered from 1 so the response can be matched back to
+        them; see `parse_batched_question_response`.
+        """
+
+        contexts_text = "\n\n".join(
+            f"[{index}] {context}" for index, context in enumerate(contexts, start=1)
+        )
+        topic_instruction = f"\n- Focus on the topic: {topic}" if topic else ""
+
+        prompt = f"""
+Generate {n_per_context} high-quality quiz question(s) for EACH of the following {len(contexts)} contexts.
+Each context is prefixed with its index in square brackets.
+
+Contexts:
+{contexts_text}
+
+Requirements:
+- Difficulty: {difficulty}
+- Question type: {question_type}{topic_instruction}
+- Each question must be answerable from its own context only
+- Include clear, unambiguous answer options (A, B, C, D)
+- Provide a detailed explanation for the correct answer
+- Classify according to Bloom's taxonomy
+
+Response format (JSON), with exactly one entry per context index:
+{{
+    "results": [
+        {{
+            "index": 1,
+            "questions": [
+                {{
+                    "question_text": "Question text",
+                    "question_type": "{question_type}",
+                    "options": [
+                        {{"label": "A", "text": "Option A"}},
+                        {{"label": "B", "text": "Option B"}},
+                        {{"label": "C", "text": "Option C"}},
+                        {{"label": "D", "text": "Option D"}}
+                    ],
+                    "correct_answer": "A",
+                    "explanation": "Explanation",
+                    "difficulty_level": "{difficulty}",
+                    "bloom_level": "Bloom's level",
+                    "topic": "Question topic"
+                }}
+            ]
+        }}
+    ]
+}}
+
+Generate questions for all {len(contexts)} contexts:
+"""
+        return prompt
+
+    def parse_batched_question_response(
+        self,
+        response_text: str,
+        contexts: list[str],
+        n_per_context: int = 1,
+        difficulty: str = "medium",
+        question_type: str = "multiple_choice",
+        topic: str | None = None,
+    ) -> tuple[dict[int, list[dict[str, Any]]], dict[int, str]]:
+        """Parse a batched generation response.
+
+        Returns the questions keyed by 1-based context index, and per-context
+        fallback prompts for every index that is missing, malformed or
+        answered more than once in the response so they can be retried
+        individually.
+        """
+
+        questions_by_index: dict[int, list[dict[str, Any]]] = {}
+        duplicate_indices: set[int] = set()
+
+        try:
+            results = json.loads(response_text).get("results", [])
+        except (json.JSONDecodeError, AttributeError):
+            results = []
+
+        if isinstance(results, list):
+            for result in results:
+                if not isinstance(result, dict):
+                    continue
+                index = result.get("index")
+                questions = result.get("questions")
+                if not (
+                    isinstance(index, int)
+                    and not isinstance(index, bool)
+                    and 1 <= index <= len(contexts)
+                    and isinstance(questions, list)
+                    and questions
+                ):
+                    continue
+                if index in questions_by_index:
+                    # Ambiguous: one of the entries likely belongs to another
+                    # context, so retry the index rather than guess.
+                    duplicate_indices.add(index)
+                questions_by_index[index] = questions
+
+        for index in duplicate_indices:
+            del questions_by_index[index]
+
+        retry_prompts = {}
+        for index, context in enumerate(contexts, start=1):
+            if index in questions_by_index:
+                continue
+            if n_per_context == 1:
+                retry_prompts[index] = self.get_question_generation_prompt(
+                    context, difficulty, question_type, topic
+                )
+            else:
+                retry_prompts[index] = self.get_batch_generation_prompt(
+                    context,
+                    n_per_context,
+                    {
+                        "difficulty": difficulty,
+                        "question_types": [question_type],
+                        "topics": [topic] if topic else [],
+                    },
+                )
+
+        return questions_by_index, retry_prompts
@@ -1,13 +1,51 @@
 """Text processing utilities for chunking and preprocessing."""
 
+import hashlib
 import logging
+import os
 import re
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from functools import cache
+from itertools import chain
+
+try:
+    import tiktoken
+except ImportError:
+    # Optional dependency; fall back to heuristic token estimation
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
+# BPE encoding used for exact token counts when tiktoken is installed
+_TIKTOKEN_ENCODING = "cl100k_base"
 
-@dataclass
+# Regex patterns are compiled once at import and shared by all processors
+_SENTENCE_RE = re.compile(r"[.!?]+\s+")
+# Title lines; the match is bounded to one line so that scanning a whole
+# document finds every title rather than one match swallowing several lines
+_TITLE_RE = re.compile(
+    r"^(?:#{1,6}\s+|[A-Z][^.!?\n]*:?[ \t]*$)", re.MULTILINE | re.ASCII
+)
+_SPECIAL_CHARS_RE = re.compile(r"[^\w\s\.\!\?\,\;\:\-\(\)\[\]\{\}\"\'\/]")
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+# Maximum number of words sampled when checking a chunk for repetition
+_REPETITION_SAMPLE_WORDS = 500
+
+# Line prefixes that mark bulleted list items
+_LIST_PREFIXES = ("- ", "* ", "• ", "+ ")
+
+# Number of distinct texts whose token counts are memoized
+_TOKEN_CACHE_SIZE = 4096
+
+# Memoized token counts, keyed by a digest of the text and the encoding name
+_TOKEN_COUNTS: OrderedDict[tuple[bytes, str], int] = OrderedDict()
+
+
+@dataclass(slots=True, frozen=True)
 class ChunkMetadata:
     """Metadata for a text chunk."""
 
@@ -21,6 +59,142 @@ class ChunkMetadata:
     content_type: str  # 'paragraph', 'list', 'title', 'mixed'
 
 
+@dataclass(slots=True)
+class Section:
+    """A logical section (paragraph) of a document."""
+
+    text: str
+    start: int
+    end: int
+    type: str  # 'paragraph', 'list', 'title', 'code'
+
+
+@dataclass
+class _TextAnalysis:
+    """Sentence and title boundaries of a cleaned document, computed once."""
+
+    sentence_ends: list[int]
+    title_starts: list[int]
+
+    def sentence_count(self, start: int, end: int) -> int:
+        """Count sentences in the document span [start, end)."""
+        if end <= start:
+            return 0
+        # Boundaries strictly inside the span, plus the trailing sentence
+        inner = bisect_left(self.sentence_ends, end) - bisect_right(
+            self.sentence_ends, start
+        )
+        return inner + 1
+
+    def has_title(self, start: int, end: int) -> bool:
+        """Check whether a title starts within the document span [start, end)."""
+        i = bisect_left(self.title_starts, start)
+        return i < len(self.title_starts) and self.title_starts[i] < end
+
+
+def _is_list_item(line: str) -> bool:
+    """Check whether a line is a bulleted or numbered list item."""
+
+    stripped = line.lstrip()
+    if stripped.startswith(_LIST_PREFIXES):
+        return True
+
+    # Numbered items: one or more digits, a dot, then whitespace ("1. ...")
+    digits = len(stripped) - len(stripped.lstrip("0123456789"))
+    return (
+        digits > 0
+        and stripped[digits : digits + 1] == "."
+        and stripped[digits + 1 : digits + 2].isspace()
+    )
+
+
+def _unique_ratio_is_low(text: str, threshold: float = 0.3) -> bool:
+    """Check whether fewer than `threshold` of the leading words are unique.
+
+    Only the first _REPETITION_SAMPLE_WORDS words are considered, words are
+    lowercased individually instead of copying the whole text, and the scan
+    stops as soon as enough unique words have been seen.
+    """
+
+    words = text.split(maxsplit=_REPETITION_SAMPLE_WORDS)[:_REPETITION_SAMPLE_WORDS]
+    required = len(words) * threshold
+
+    seen: set[str] = set()
+    for word in words:
+        seen.add(word.lower())
+        if len(seen) >= required:
+            return False
+
+    return len(seen) < required
+
+
+def _estimate_tokens_heuristic(text: str) -> int:
+    """Estimate token count from word and character counts."""
+
+    # More sophisticated token estimation
+    # Account for whitespace, punctuation, and word boundaries.
+    # Counting separators avoids building a list of words; it slightly
+    # over-counts whitespace runs (only paragraph breaks survive
+    # _clean_text), which errs on the safe side for an estimate.
+    words = text.count(" ") + text.count("\n") + 1
+    chars = len(text)
+
+    # Empirical formula that's more accurate than simple division
+    # Based on OpenAI's tokenization patterns
+    estimated_tokens = int(words * 1.3 + chars * 0.25)
+
+    # Ensure minimum of word count (each word is at least 1 token)
+    return max(words, estimated_tokens)
+
+
+@cache
+def _get_encoder(name: str = _TIKTOKEN_ENCODING) -> "tiktoken.Encoding | None":
+    """Load a tiktoken encoding once per process, shared by all processors.
+
+    Returns None without tiktoken or when the encoding fails to load, and a
+    failed load is not retried for every new processor.
+    """
+
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Failed to load tiktoken encoding: {e}")
+        return None
+
+
+def _encode(text: str, enc: "tiktoken.Encoding | None") -> int:
+    """Count tokens exactly with the `enc` tokenizer, or estimate without one."""
+
+    if enc is not None:
+        return len(enc.encode_ordinary(text))
+
+    return _estimate_tokens_heuristic(text)
+
+
+def _count_tokens(text: str, enc: "tiktoken.Encoding | None") -> int:
+    """Memoized _encode; overlapping chunks are often counted more than once.
+
+    Counts are keyed by a digest of the text rather than the text itself, so
+    the cache does not keep large documents alive.
+    """
+
+    key = (
+        hashlib.blake2b(text.encode(), digest_size=16).digest(),
+        enc.name if enc is not None else "",
+    )
+    count = _TOKEN_COUNTS.get(key)
+    if count is None:
+        count = _encode(text, enc)
+        _TOKEN_COUNTS[key] = count
+        if len(_TOKEN_COUNTS) > _TOKEN_CACHE_SIZE:
+            _TOKEN_COUNTS.popitem(last=False)
+    else:
+        _TOKEN_COUNTS.move_to_end(key)
+    return count
+
+
 class TextProcessor:
     """Service for processing and chunking text content."""
 
@@ -34,12 +208,8 @@ class TextProcessor:
         self.chunk_overlap = chunk_overlap
         self.min_chunk_size = min_chunk_size
 
-        # Compile regex patterns for better performance
-        self.sentence_pattern = re.compile(r"[.!?]+\s+")
-        self.title_pattern = re.compile(
-            r"^(?:#{1,6}\s+|[A-Z][^.!?]*:?\s*$)", re.MULTILINE
-        )
-        self.list_pattern = re.compile(r"^\s*[-*•]\s+|^\s*\d+\.\s+", re.MULTILINE)
+        # Exact tokenizer when available, otherwise estimate heuristically
+        self._enc = _get_encoder()
 
     async def chunk_text(self, text: str, preserve_structure: bool = True) -> list[str]:
         """Split text into chunks with optional structure preservation."""
@@ -81,71 +251,79 @@ class TextProcessor:
         """Chunk text while preserving semantic structure and return metadata."""
 
         chunks = []
+        analysis = self._analyze_text(text)
 
         # Detect document structure
         sections = self._identify_sections(text)
 
-        current_chunk = ""
-        current_start = 0
+        # The current chunk is tracked as a span of the document, so its text
+        # is always a slice of the document at its recorded offsets
+        current_start = current_end = 0
+        # Characters per section type in the current chunk
+        current_types: dict[str, int] = {}
         chunk_index = 0
 
         for section in sections:
-            section_text = section["text"].strip()
-            if not section_text:
-                continue
-
-            section_size = len(section_text)
-            current_size = len(current_chunk)
-
             # Check if adding this section would exceed chunk size
-            if current_size + section_size > self.chunk_size and current_chunk:
+            if (
+                current_types
+                and current_end - current_start + len(section.text) > self.chunk_size
+            ):
                 # Finalize current chunk
                 chunk_metadata = self._create_chunk_metadata(
-                    current_chunk,
+                    text[current_start:current_end],
                     chunk_index,
                     current_start,
-                    current_start + len(current_chunk),
+                    current_end,
+                    analysis,
+                    self._combine_section_types(current_types),
                 )
-                chunks.append((current_chunk.strip(), chunk_metadata))
+                chunks.append((text[current_start:current_end], chunk_metadata))
                 chunk_index += 1
+                current_types = {}
 
                 # Start new chunk with smart overlap
-                overlap_text = self._get_semantic_overlap(current_chunk, section_text)
-                current_chunk = (
-                    overlap_text + "\n\n" + section_text
-                    if overlap_text
-                    else section_text
+                overlap_start = self._get_semantic_overlap(
+                    text, current_start, current_end, analysis.sentence_ends
                 )
                 current_start = (
-                    section["start"] - len(overlap_text)
-                    if overlap_text
-                    else section["start"]
+                    overlap_start if overlap_start < current_end else section.start
                 )
-            else:
-                # Add section to current chunk
-                if current_chunk:
-                    current_chunk += "\n\n" + section_text
-                else:
-                    current_chunk = section_text
-                    current_start = section["start"]
+            elif not current_types:
+                current_start = section.start
+
+            current_end = section.end
+            current_types[section.type] = current_types.get(section.type, 0) + len(
+                section.text
+            )
 
         # Handle the last chunk
-        if current_chunk.strip():
+        if current_types:
             chunk_metadata = self._create_chunk_metadata(
-                current_chunk,
+                text[current_start:current_end],
                 chunk_index,
                 current_start,
-                current_start + len(current_chunk),
+                current_end,
+                analysis,
+                self._combine_section_types(current_types),
             )
-            chunks.append((current_chunk.strip(), chunk_metadata))
+            chunks.append((text[current_start:current_end], chunk_metadata))
 
         # Post-process chunks to ensure minimum size and quality
-        return self._post_process_chunks(chunks)
+        return self._post_process_chunks(text, analysis, chunks)
 
     async def _sliding_window_chunking(self, text: str) -> list[str]:
         """Simple sliding window chunking."""
-        chunks_with_metadata = await self._sliding_window_chunking_with_metadata(text)
-        return [chunk for chunk, _ in chunks_with_metadata]
+
+        sentence_ends = (m.end() for m in _SENTENCE_RE.finditer(text))
+        chunks = []
+
+        for start, end in self._sentence_windows(text, sentence_ends):
+            chunk_text = text[start:end].strip()
+            if chunk_text and len(chunk_text) >= self.min_chunk_size:
+                chunks.append(chunk_text)
+
+        return chunks
 
     async def _sliding_window_chunking_with_metadata(
         self, text: str
@@ -153,66 +331,112 @@ class TextProcessor:
         """Simple sliding window chunking with metadata."""
 
         chunks = []
-        text_length = len(text)
-        start = 0
+        analysis = self._analyze_text(text)
         chunk_index = 0
 
-        while start < text_length:
-            end = start + self.chunk_size
-
-            # Find a good breaking point (end of sentence)
-            if end < text_length:
-                end = self._find_sentence_boundary(text, start, end)
-
+        for start, end in self._sentence_windows(text, analysis.sentence_ends):
             chunk_text = text[start:end].strip()
             if chunk_text and len(chunk_text) >= self.min_chunk_size:
                 chunk_metadata = self._create_chunk_metadata(
-                    chunk_text, chunk_index, start, end
+                    chunk_text, chunk_index, start, end, analysis
                 )
                 chunks.append((chunk_text, chunk_metadata))
                 chunk_index += 1
 
-            # Move start position with overlap
-            overlap_start = max(start + self.chunk_size - self.chunk_overlap, end)
-            start = overlap_start if overlap_start > start else end
-
         return chunks
 
+    def _sentence_windows(
+        self, text: str, sentence_ends: Iterable[int]
+    ) -> Iterator[tuple[int, int]]:
+        """Yield the (start, end) spans of overlapping windows of sentences.
+
+        Sentences are appended to a deque until the next one would exceed
+        chunk_size. The window is then emitted and sentences are dropped from
+        its left until what remains fits in chunk_overlap. Every sentence
+        enters and leaves the window once, so the scan is linear in the
+        number of sentences and chunks are sliced from the text directly.
+        """
+
+        # Sentences are contiguous, so the window is tracked by the start
+        # offsets of its sentences and the end offset of the last one
+        window: deque[int] = deque()
+        window_end = 0
+
+        for start, end in self._sentence_spans(text, sentence_ends):
+            if window and end - window[0] > self.chunk_size:
+                yield window[0], window_end
+
+                # Keep the trailing sentences as overlap, as long as the next
+                # sentence still fits alongside them
+                while window and (
+                    window_end - window[0] > self.chunk_overlap
+                    or end - window[0] > self.chunk_size
+                ):
+                    window.popleft()
+
+            window.append(start)
+            window_end = end
+
+        if window:
+            yield window[0], window_end
+
+    def _sentence_spans(
+        self, text: str, sentence_ends: Iterable[int]
+    ) -> Iterator[tuple[int, int]]:
+        """Yield sentence spans, hard-splitting those longer than chunk_size."""
+
+        start = 0
+        for end in chain(sentence_ends, (len(text),)):
+            while end - start > self.chunk_size:
+                yield start, start + self.chunk_size
+                start += self.chunk_size
+            if end > start:
+                yield start, end
+                start = end
+
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text."""
 
-        # Remove excessive whitespace
-        text = re.sub(r"\s+", " ", text)
-
         # Remove special characters that might interfere
-        text = re.sub(r"[^\w\s\.\!\?\,\;\:\-\(\)\[\]\{\}\"\'\/]", "", text)
+        text = _SPECIAL_CHARS_RE.sub("", text)
 
-        # Normalize line breaks
-        text = re.sub(r"\n\s*\n", "\n\n", text)
+        # Normalize line breaks, then collapse whitespace within each paragraph.
+        # str.split()/join is much cheaper than a regex substitution here.
+        paragraphs = (" ".join(p.split()) for p in _PARAGRAPH_BREAK_RE.split(text))
 
-        return text.strip()
+        return "\n\n".join(p for p in paragraphs if p)
 
-    def _identify_sections(self, text: str) -> list[dict]:
-        """Identify logical sections in the text."""
+    def _analyze_text(self, text: str) -> _TextAnalysis:
+        """Index sentence and title boundaries of the whole document once.
+
+        Chunk metadata is then derived from these indexes with binary search
+        instead of re-running the regexes over every (overlapping) chunk.
+        """
+
+        return _TextAnalysis(
+            sentence_ends=[m.end() for m in _SENTENCE_RE.finditer(text)],
+            title_starts=[m.start() for m in _TITLE_RE.finditer(text)],
+        )
+
+    def _identify_sections(self, text: str) -> list[Section]:
+        """Identify and classify logical sections in the text in one pass."""
 
         sections = []
-        paragraphs = text.split("\n\n")
         current_pos = 0
 
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                current_pos += 2  # Account for double newline
-                continue
-
-            section_info = {
-                "text": paragraph,
-                "start": current_pos,
-                "end": current_pos + len(paragraph),
-                "type": self._classify_section_type(paragraph),
-            }
-            sections.append(section_info)
-            current_pos += len(paragraph) + 2  # Add paragraph + double newline
+        for raw_paragraph in text.split("\n\n"):
+            paragraph = raw_paragraph.strip()
+            if paragraph:
+                start = current_pos + len(raw_paragraph) - len(raw_paragraph.lstrip())
+                sections.append(
+                    Section(
+                        text=paragraph,
+                        start=start,
+                        end=start + len(paragraph),
+                        type=self._classify_section_type(paragraph),
+                    )
+                )
+            current_pos += len(raw_paragraph) + 2  # Add paragraph + double newline
 
         return sections
 
@@ -222,12 +446,16 @@ class TextProcessor:
         text_lines = text.split("\n")
         first_line = text_lines[0].strip()
 
-        # Check for titles/headings
-        if self.title_pattern.match(first_line):
+        # Check for titles/headings, skipping the regex unless the line starts
+        # with a character a title can start with
+        first_char = first_line[:1]
+        if (first_char == "#" or "A" <= first_char <= "Z") and _TITLE_RE.match(
+            first_line
+        ):
             return "title"
 
         # Check for lists
-        if any(self.list_pattern.match(line) for line in text_lines):
+        if any(_is_list_item(line) for line in text_lines):
             return "list"
 
         # Check for code blocks
@@ -237,58 +465,69 @@ class TextProcessor:
         # Default to paragraph
         return "paragraph"
 
-    def _find_sentence_boundary(self, text: str, start: int, target_end: int) -> int:
-        """Find the best sentence boundary near the target end position."""
+    def _combine_section_types(self, section_types: dict[str, int]) -> str:
+        """Derive a chunk's content type from the types of its sections.
 
-        search_start = max(start + self.chunk_size // 2, target_end - 200)
-        search_end = min(len(text), target_end + 100)
+        `section_types` maps each section type in the chunk to its number of
+        characters; the type covering the most text wins.
+        """
 
-        # Look for sentence endings
-        best_end = target_end
-        for i in range(search_start, search_end):
-            if i < len(text) and text[i] in ".!?":
-                # Check if this looks like a real sentence ending
-                if i + 1 < len(text) and (
-                    text[i + 1].isspace() or text[i + 1].isupper()
-                ):
-                    if abs(i - target_end) < abs(best_end - target_end):
-                        best_end = i + 1
+        return max(section_types, key=section_types.__getitem__)
 
-        return best_end
+    def _get_semantic_overlap(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        sentence_ends: list[int],
+    ) -> int:
+        """Get the document offset where the overlap with the next chunk starts.
 
-    def _get_semantic_overlap(self, current_chunk: str, next_section: str) -> str:
-        """Get semantically meaningful overlap between chunks."""
+        `sentence_ends` are the document-wide sentence boundaries and the
+        previous chunk spans [start, end) of `text`. Returns `end` when there
+        is no overlap.
+        """
 
-        if len(current_chunk) <= self.chunk_overlap:
-            return current_chunk
+        if end - start <= self.chunk_overlap:
+            return start
 
         # Try to find the last complete sentence within overlap range
-        overlap_start = len(current_chunk) - self.chunk_overlap
-        overlap_text = current_chunk[overlap_start:]
+        overlap_start = end - self.chunk_overlap
 
-        # Find the start of the last complete sentence
-        sentences = self.sentence_pattern.split(overlap_text)
-        if len(sentences) > 1:
-            # Return the last complete sentence(s)
-            return self.sentence_pattern.split(current_chunk)[-1].strip()
+        # Last sentence boundary inside the chunk, found by binary search
+        idx = bisect_left(sentence_ends, end) - 1
+        if idx >= 0 and sentence_ends[idx] > overlap_start:
+            # Start at the last complete sentence(s)
+            overlap_start = sentence_ends[idx]
 
-        # Fallback to character-based overlap
-        return overlap_text.strip()
+        # Otherwise fall back to a character-based overlap, which like a
+        # sentence overlap starts at the next non-whitespace character
+        while overlap_start < end and text[overlap_start].isspace():
+            overlap_start += 1
+        return overlap_start
 
     def _create_chunk_metadata(
-        self, chunk_text: str, index: int, start: int, end: int
+        self,
+        chunk_text: str,
+        index: int,
+        start: int,
+        end: int,
+        analysis: _TextAnalysis,
+        content_type: str | None = None,
     ) -> ChunkMetadata:
-        """Create metadata for a text chunk."""
+        """Create metadata for a text chunk spanning [start, end) of the document.
 
-        # Count sentences
-        sentences = self.sentence_pattern.split(chunk_text)
-        sentence_count = len([s for s in sentences if s.strip()])
+        `content_type` can be passed when it is already known (e.g. from the
+        classified sections a chunk was built from) to skip reclassification.
+        """
 
-        # Check for titles
-        has_title = bool(self.title_pattern.search(chunk_text))
+        # Count sentences and check for titles using the document-wide index
+        sentence_count = analysis.sentence_count(start, end)
+        has_title = analysis.has_title(start, end)
 
         # Determine content type
-        content_type = self._classify_section_type(chunk_text)
+        if content_type is None:
+            content_type = self._classify_section_type(chunk_text)
 
         # Calculate quality score
         quality_score = self._calculate_chunk_quality(
@@ -334,47 +573,85 @@ class TextProcessor:
         if text.strip().endswith((".", "!", "?")):
             score += 0.1
 
-        # Penalize very repetitive content
-        words = text.lower().split()
-        if len(set(words)) < len(words) * 0.3:  # Less than 30% unique words
+        # Penalize very repetitive content (less than 30% unique words)
+        if _unique_ratio_is_low(text):
             score -= 0.2
 
         return max(0.0, min(1.0, score))
 
     def _post_process_chunks(
-        self, chunks: list[tuple[str, ChunkMetadata]]
+        self,
+        text: str,
+        analysis: _TextAnalysis,
+        chunks: list[tuple[str, ChunkMetadata]],
     ) -> list[tuple[str, ChunkMetadata]]:
-        """Post-process chunks to improve quality."""
+        """Post-process chunks to improve quality.
+
+        Chunks that are too small are merged forward into the next chunk in a
+        single pass. A merged chunk is the document span covering both halves,
+        so text shared through overlap is not repeated. Its sentence count and
+        title flag are taken from the document-wide analysis, and it is
+        tokenized once when finalized rather than on every merge.
+        """
 
         if not chunks:
             return chunks
 
         processed_chunks = []
+        buf_text, buf_meta = chunks[0]
+        merged = False
+
+        for chunk_text, metadata in chunks[1:]:
+            if (
+                len(buf_text) < self.min_chunk_size
+                and metadata.end_char - buf_meta.start_char <= self.chunk_size * 1.2
+            ):
+                # Merge the undersized buffer with the next chunk, keeping the
+                # content type of whichever half is longer
+                content_type = (
+                    buf_meta.content_type
+                    if len(buf_text) > len(chunk_text)
+                    else metadata.content_type
+                )
+                buf_text = text[buf_meta.start_char : metadata.end_char]
+                buf_meta = replace(
+                    buf_meta,
+                    end_char=metadata.end_char,
+                    sentence_count=analysis.sentence_count(
+                        buf_meta.start_char, metadata.end_char
+                    ),
+                    has_title=analysis.has_title(
+                        buf_meta.start_char, metadata.end_char
+                    ),
+                    content_type=content_type,
+                )
+                merged = True
+                continue
+
+            processed_chunks.append(self._finalize_chunk(buf_text, buf_meta, merged))
+            buf_text, buf_meta = chunk_text, metadata
+            merged = False
 
-        for i, (chunk_text, metadata) in enumerate(chunks):
-            # Skip chunks that are too small unless they're the last one
-            if len(chunk_text) < self.min_chunk_size and i < len(chunks) - 1:
-                # Merge with next chunk if possible
-                if i + 1 < len(chunks):
-                    next_chunk, next_metadata = chunks[i + 1]
-                    merged_text = chunk_text + "\n\n" + next_chunk
-                    if len(merged_text) <= self.chunk_size * 1.2:
-                        # Update the next chunk and skip current
-                        chunks[i + 1] = (
-                            merged_text,
-                            self._create_chunk_metadata(
-                                merged_text,
-                                metadata.chunk_index,
-                                metadata.start_char,
-                                next_metadata.end_char,
-                            ),
-                        )
-                        continue
-
-            processed_chunks.append((chunk_text, metadata))
+        processed_chunks.append(self._finalize_chunk(buf_text, buf_meta, merged))
 
         return processed_chunks
 
+    def _finalize_chunk(
+        self, chunk_text: str, metadata: ChunkMetadata, merged: bool
+    ) -> tuple[str, ChunkMetadata]:
+        """Finalize a post-processed chunk, recounting and rescoring it if merged."""
+
+        if merged:
+            metadata = replace(
+                metadata,
+                token_count=self.estimate_tokens(chunk_text),
+                quality_score=self._calculate_chunk_quality(
+                    chunk_text, metadata.sentence_count, metadata.has_title
+                ),
+            )
+
+        return chunk_text, metadata
+
     def _get_text_overlap(self, text: str) -> str:
         """Get overlap text from the end of a chunk."""
 
@@ -393,27 +670,29 @@ class TextProcessor:
         return overlap_text.strip()
 
     def estimate_tokens(self, text: str) -> int:
-        """Estimate token count with improved accuracy."""
-        if not text:
-            return 0
-
-        # More sophisticated token estimation
-        # Account for whitespace, punctuation, and word boundaries
-        words = len(text.split())
-        chars = len(text)
+        """Estimate token count with improved accuracy.
 
-        # Empirical formula that's more accurate than simple division
-        # Based on OpenAI's tokenization patterns
-        estimated_tokens = int(words * 1.3 + chars * 0.25)
+        Uses the tiktoken BPE tokenizer for an exact count when it is
+        installed, and a word/character heuristic otherwise. Counts are
+        cached per text, so repeated chunks are only tokenized once.
+        """
+        if not text or text.isspace():
+            return 0
 
-        # Ensure minimum of word count (each word is at least 1 token)
-        return max(words, estimated_tokens)
+        return _count_tokens(text, self._enc)
 
     def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
         """Truncate text to approximately max_tokens with smart boundaries."""
         if not text:
             return text
 
+        if self._enc is not None:
+            # Exact truncation in a single encode/decode round-trip
+            token_ids = self._enc.encode_ordinary(text)
+            if len(token_ids) <= max_tokens:
+                return text
+            return self._enc.decode(token_ids[:max_tokens])
+
         # More accurate character estimation
         estimated_chars = max_tokens * 3.5  # More conservative estimate
 
@@ -429,7 +708,9 @@ class TextProcessor:
             search_start = max(0, len(truncated) - 200)
             boundary_found = False
 
-            for i in range(len(truncated) - 1, search_start, -1):
+            # Skip the last character so a text already ending on a sentence
+            # boundary is shortened to the previous one
+            for i in range(len(truncated) - 2, search_start, -1):
                 if truncated[i] in ".!?":
                     truncated = truncated[: i + 1]
                     boundary_found = True
@@ -451,7 +732,16 @@ class TextProcessor:
             return {}
 
         chunk_lengths = [len(chunk) for chunk in chunks]
-        token_counts = [self.estimate_tokens(chunk) for chunk in chunks]
+        if self._enc is not None:
+            # Batch encoding runs in tiktoken's thread pool outside the GIL
+            token_counts = [
+                len(ids)
+                for ids in self._enc.encode_ordinary_batch(
+                    chunks, num_threads=os.cpu_count() or 1
+                )
+            ]
+        else:
+            token_counts = [self.estimate_tokens(chunk) for chunk in chunks]
 
         return {
             "total_chunks": len(chunks),
@@ -1,48 +1,390 @@
 """URL content extraction service for web scraping."""
 
 import asyncio
+import hashlib
+import io
+import multiprocessing
+import random
 import re
-from typing import Optional
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from configparser import ConfigParser
+from copy import deepcopy
+from functools import lru_cache
+from types import TracebackType
+from typing import Optional, TypeVar
 from urllib.parse import urlparse
 
 import aiohttp
 import trafilatura
 from trafilatura.settings import use_config
+from trafilatura.utils import decode_file, load_html
 
+from ..core.config import settings
 from ..core.exceptions import DocumentIngestionError
+from .http_session import get_shared_session
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Regex patterns are compiled once at import instead of on every call
+
+# Common navigation and UI patterns, fused into a single alternation so one
+# match call decides whether text is UI chrome
+_UI_PATTERNS = (
+    r"^(click|tap|press)\s+(here|this|button)",
+    r"^(home|about|contact|menu|search|login|register)",
+    r"^(previous|next|back|forward|continue)",
+    r"^(skip to|jump to|go to)",
+    r"^(share|like|follow|subscribe)",
+    r"^(cookie|privacy|terms|policy)",
+    r"^\d+\s+(comments?|replies?|likes?)",
+    r"^(loading|please wait|redirecting)",
+    r"^(error|warning|success|info):",
+    r"^\w+\s+\|\s+\w+",  # Breadcrumb pattern
+)
+_UI_COMBINED_RE = re.compile("|".join(f"(?:{pattern})" for pattern in _UI_PATTERNS))
+_UI_WORDS_RE = re.compile(r"menu|nav|link|button|tab|page|section")
+
+_EMAIL_RE = re.compile(r"\S+@\S+\.\S+")
+_URL_RE = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+)
+# The lookahead lets the scanner skip positions that cannot start a number
+_PHONE_RE = re.compile(r"(?=[\+0-9])[\+]?[1-9]?[0-9]{3}-?[0-9]{3}-?[0-9]{4}")
+_DOTS_RE = re.compile(r"[.]{3,}")
+_DASHES_RE = re.compile(r"[-]{3,}")
+_SYMBOL_RE = re.compile(r"[^\S\n]+[|•→←↑↓][^\S\n]+")
+_WS_RE = re.compile(r"\s+")
+_INLINE_WS_RE = re.compile(r"[^\S\n]+")
+_LINE_TRIM_RE = re.compile(r"^ | $", re.MULTILINE)
+# Paragraph breaks and sentence-ending punctuation, scanned together
+_SENT_BOUNDARY_RE = re.compile(r"(?P<paragraph>\n\n)|[.!?]+")
+_LINE_EDGE_WS_RE = re.compile(r"[^\S\n]*\n[^\S\n]*")
+_BLANK_LINE_RE = re.compile(r"^[^\w\n]*\n", re.MULTILINE)
+
+# File types that cannot be processed as web pages
+_UNSUPPORTED_EXTENSIONS = frozenset(
+    {
+        "pdf",
+        "doc",
+        "docx",
+        "xls",
+        "xlsx",
+        "ppt",
+        "pptx",
+        "zip",
+        "rar",
+        "tar",
+        "gz",
+        "mp3",
+        "mp4",
+        "avi",
+        "jpg",
+        "jpeg",
+        "png",
+        "gif",
+        "svg",
+        "exe",
+        "dmg",
+    }
+)
+
+# Subtrees that never hold article text, dropped before trafilatura sees the page
+_BOILERPLATE_TAGS = ["script", "style", "nav", "footer"]
+_MIN_BODY_CHARS = 200
+
+
+class _PermanentError(DocumentIngestionError):
+    """Extraction failure that retrying cannot fix."""
+
+
+def _quick_body_len(tree: LexborHTMLParser) -> int:
+    """Get the length of the visible body text of a parsed page."""
+
+    if tree.body is None:
+        return 0
+    return len(tree.body.text(strip=True))
+
+
+def _iter_sentences(text: str) -> Iterator[tuple[int, str]]:
+    """Yield (paragraph index, sentence) pairs from a single scan of text."""
+
+    paragraph_id = 0
+    start = 0
+    for match in _SENT_BOUNDARY_RE.finditer(text):
+        yield paragraph_id, text[start : match.start()]
+        if match.lastgroup == "paragraph":
+            paragraph_id += 1
+        start = match.end()
+    yield paragraph_id, text[start:]
+
+
+def _prefilter_html(html_content: str | bytes, url: str) -> str | bytes:
+    """Strip boilerplate subtrees and reject near-empty pages cheaply.
+
+    Uses selectolax's lexbor backend, which parses far faster than trafilatura's lxml pipeline,
+    so trivially empty pages never reach trafilatura. Returns the HTML
+    unchanged when selectolax is not installed.
+    """
+
+    if LexborHTMLParser is None:
+        return html_content
+
+    # lexbor assumes UTF-8 for bytes, so undeclared encodings are sniffed first
+    if isinstance(html_content, bytes):
+        html_content = decode_file(html_content)
+
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(_BOILERPLATE_TAGS)
+
+    if _quick_body_len(tree) < _MIN_BODY_CHARS:
+        raise _PermanentError(f"No extractable content found at URL: {url}")
+
+    # Serializing only fails for an empty tree; extract from the page as is
+    return tree.html or html_content
+
+
+# trafilatura parsing is CPU-bound pure Python, so it runs in worker processes
+# to keep it off the event loop and out from under the GIL
+_EXTRACT_POOL: ProcessPoolExecutor | None = None
+_WORKER_CONFIG: ConfigParser | None = None
+
+
+def _get_worker_config() -> ConfigParser:
+    """Get the trafilatura config of the current process, building it once."""
+
+    global _WORKER_CONFIG
+
+    if _WORKER_CONFIG is None:
+        _WORKER_CONFIG = use_config()
+        _WORKER_CONFIG.set("DEFAULT", "EXTRACTION_TIMEOUT", "30")
+        _WORKER_CONFIG.set("DEFAULT", "MIN_EXTRACTED_SIZE", "100")
+    return _WORKER_CONFIG
+
+
+def _extract_worker(html_content: str | bytes, url: str) -> str | None:
+    """Extract the main content of an HTML page.
+
+    Defined at module level so it can be pickled into the extraction pool.
+    """
+
+    # Parse once and hand both passes a tree; trafilatura prunes the tree it
+    # is given in place, so the first pass works on a copy
+    tree = load_html(html_content)
+    if tree is None:
+        return None
+
+    extracted_text: str | None = trafilatura.extract(
+        deepcopy(tree),
+        config=_get_worker_config(),
+        include_comments=False,
+        include_tables=True,
+        include_links=False,
+        include_images=False,
+        favor_precision=True,
+        favor_recall=False,
+        deduplicate=True,
+        url=url,
+    )
+
+    if not extracted_text:
+        # Fallback: try with different settings
+        extracted_text = trafilatura.extract(
+            tree,
+            include_comments=False,
+            include_tables=True,
+            favor_precision=False,
+            favor_recall=True,
+            url=url,
+        )
+
+    return extracted_text
+
+
+def _get_extract_pool() -> ProcessPoolExecutor | None:
+    """Get the extraction process pool, starting it on first use.
+
+    Returns None when `url_extraction_processes` is 0, in which case
+    extraction runs in the event loop's default thread pool instead.
+    """
+
+    global _EXTRACT_POOL
+
+    if settings.url_extraction_processes == 0:
+        return None
+    if _EXTRACT_POOL is None:
+        # Spawned rather than forked, so workers do not inherit the event
+        # loop, open sockets or locks held by other threads
+        _EXTRACT_POOL = ProcessPoolExecutor(
+            max_workers=settings.url_extraction_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_get_worker_config,
+        )
+    return _EXTRACT_POOL
+
+
+def _discard_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut down a broken extraction pool so the next call starts a new one."""
+
+    global _EXTRACT_POOL
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Another call may already have replaced the broken pool
+    if _EXTRACT_POOL is pool:
+        _EXTRACT_POOL = None
+
+
+async def _extract_off_loop(html_content: str | bytes, url: str) -> str | None:
+    """Run `_extract_worker` in the extraction pool.
+
+    A worker that dies (e.g. killed for running out of memory) breaks the
+    whole pool, so the broken pool is replaced and the page retried once.
+    """
+
+    loop = asyncio.get_running_loop()
+    pool = _get_extract_pool()
+    try:
+        return await loop.run_in_executor(pool, _extract_worker, html_content, url)
+    except BrokenProcessPool:
+        if pool is None:
+            raise
+        _discard_extract_pool(pool)
+
+    pool = _get_extract_pool()
+    try:
+        return await loop.run_in_executor(pool, _extract_worker, html_content, url)
+    except BrokenProcessPool:
+        if pool is not None:
+            _discard_extract_pool(pool)
+        raise
+
+
+# Extraction is deterministic for a given page, so results are cached by a
+# digest of the HTML; mirrored or re-fetched pages then skip trafilatura.
+# Cleaned content is also memoized per URL for a short TTL.
+_CACHE_MAXSIZE = 1024
+_EXTRACTION_CACHE: OrderedDict[bytes, str] = OrderedDict()
+_URL_CACHE: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def _html_digest(html_bytes: bytes | bytearray) -> bytes:
+    """Get the cache key of an HTML page."""
+    return hashlib.blake2b(html_bytes, digest_size=16).digest()
+
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+def _cache_get(cache: OrderedDict[_K, _V], key: _K) -> _V | None:
+    """Look up a key, marking it as most recently used."""
+
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict[_K, _V], key: _K, value: _V) -> None:
+    """Store a value, evicting the least recently used entry when full."""
+
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _CACHE_MAXSIZE:
+        cache.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _parse_url_cached(url: str) -> tuple[str, str, str]:
+    """Split a URL into its scheme, netloc and path."""
+
+    parsed = urlparse(url)
+    return parsed.scheme, parsed.netloc, parsed.path
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_url_cached(url: str) -> bool:
+    """Check if URL is valid and accessible for content extraction."""
+
+    try:
+        scheme, netloc, path = _parse_url_cached(url)
+
+        # Check basic URL structure
+        if not scheme or not netloc:
+            return False
+
+        # Check if scheme is supported
+        if scheme not in ["http", "https"]:
+            return False
+
+        # Check for common file extensions that we can't process
+        extension = path.rpartition(".")[2].lower()
+        if extension in _UNSUPPORTED_EXTENSIONS:
+            return False
+
+        return True
+
+    except Exception:
+        return False
+
+
+# Client errors worth retrying: request timeout and rate limiting
+_RETRIABLE_STATUSES = frozenset({408, 429})
 
 
 class URLExtractor:
     """Service for extracting content from web URLs."""
 
-    def __init__(self, timeout: int = 30, max_retries: int = 3):
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_bytes: int = 5 * 1024 * 1024,
+        session: aiohttp.ClientSession | None = None,
+    ):
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_bytes = max_bytes
+        self._session = session
         self.session = None
 
-        # Configure trafilatura for better extraction
-        self.config = use_config()
-        self.config.set("DEFAULT", "EXTRACTION_TIMEOUT", "30")
-        self.config.set("DEFAULT", "MIN_EXTRACTED_SIZE", "100")
-
-    async def __aenter__(self):
-        """Async context manager entry."""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/91.0.4472.124 Safari/537.36"
-                )
-            },
-        )
+    async def __aenter__(self) -> "URLExtractor":
+        """Async context manager entry.
+
+        Uses the session passed to the constructor, or else the shared one.
+        """
+        if self._session is not None:
+            self.session = self._session
+        else:
+            self.session = await get_shared_session()
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Async context manager exit.
+
+        The session stays open for reuse; the shared one is closed at
+        application shutdown via `close_shared_session`.
+        """
+
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """Shut down the extraction process pool."""
+        global _EXTRACT_POOL
+
+        if _EXTRACT_POOL is not None:
+            _EXTRACT_POOL.shutdown(cancel_futures=True)
+        _EXTRACT_POOL = None
 
     async def extract_content(self, url: str) -> str:
         """Extract text content from a URL with retry logic."""
@@ -53,20 +395,28 @@ class URLExtractor:
             )
 
         # Validate URL
-        parsed_url = urlparse(url)
-        if not parsed_url.scheme or not parsed_url.netloc:
+        scheme, netloc, _ = _parse_url_cached(url)
+        if not scheme or not netloc:
             raise DocumentIngestionError(f"Invalid URL format: {url}")
 
+        cached = _cache_get(_URL_CACHE, url)
+        if cached and time.monotonic() - cached[0] < settings.cache_ttl_urls:
+            return cached[1]
+
         last_exception = None
 
         for attempt in range(self.max_retries):
             try:
-                return await self._extract_content_attempt(url)
+                content = await self._extract_content_attempt(url)
+                _cache_put(_URL_CACHE, url, (time.monotonic(), content))
+                return content
+            except _PermanentError:
+                raise
             except Exception as e:
                 last_exception = e
                 if attempt < self.max_retries - 1:
-                    # Wait before retry with exponential backoff
-                    await asyncio.sleep(2**attempt)
+                    # Wait before retry with jittered exponential backoff
+                    await asyncio.sleep(2**attempt + random.random())
                     continue
                 break
 
@@ -75,16 +425,44 @@ class URLExtractor:
             f"Last error: {str(last_exception)}"
         )
 
+    async def extract_many(
+        self, urls: list[str], concurrency: int = 16
+    ) -> list[str | BaseException]:
+        """Extract content from several URLs concurrently.
+
+        At most `concurrency` URLs are fetched at once. Results are returned in
+        the order of `urls`; a failed URL yields its exception instead of text.
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def extract_one(url: str) -> str:
+            async with semaphore:
+                return await self.extract_content(url)
+
+        return await asyncio.gather(
+            *(extract_one(url) for url in urls), return_exceptions=True
+        )
+
     async def _extract_content_attempt(self, url: str) -> str:
         """Single attempt to extract content from URL."""
 
         try:
             # Download the webpage
-            async with self.session.get(url) as response:
+            async with self.session.get(
+                url, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
                 if response.status == 404:
-                    raise DocumentIngestionError(f"URL not found: {url}")
+                    raise _PermanentError(f"URL not found: {url}")
                 elif response.status == 403:
-                    raise DocumentIngestionError(f"Access forbidden: {url}")
+                    raise _PermanentError(f"Access forbidden: {url}")
+                elif (
+                    400 <= response.status < 500
+                    and response.status not in _RETRIABLE_STATUSES
+                ):
+                    raise _PermanentError(
+                        f"HTTP error {response.status} when accessing {url}"
+                    )
                 elif response.status >= 400:
                     raise DocumentIngestionError(
                         f"HTTP error {response.status} when accessing {url}"
@@ -94,54 +472,58 @@ class URLExtractor:
                 content_type = response.headers.get("content-type", "").lower()
 
                 if "pdf" in content_type:
-                    raise DocumentIngestionError(
+                    raise _PermanentError(
                         f"URL points to PDF content. Use PDF extraction instead: {url}"
                     )
 
                 if not any(
                     ct in content_type for ct in ["text/html", "application/xhtml"]
                 ):
-                    raise DocumentIngestionError(
+                    raise _PermanentError(
                         f"Unsupported content type {content_type} for URL: {url}"
                     )
 
-                html_content = await response.text()
-
-            # Extract main content using trafilatura
-            extracted_text = trafilatura.extract(
-                html_content,
-                config=self.config,
-                include_comments=False,
-                include_tables=True,
-                include_links=False,
-                include_images=False,
-                favor_precision=True,
-                favor_recall=False,
-                deduplicate=True,
-                url=url,
-            )
+                content_length = response.headers.get("content-length", "")
+                if content_length.isdigit() and int(content_length) > self.max_bytes:
+                    raise _PermanentError(
+                        f"Page too large ({content_length} bytes) at URL: {url}"
+                    )
 
-            if not extracted_text:
-                # Fallback: try with different settings
-                extracted_text = trafilatura.extract(
-                    html_content,
-                    include_comments=False,
-                    include_tables=True,
-                    favor_precision=False,
-                    favor_recall=True,
-                    url=url,
+                # Read incrementally so oversized bodies are dropped early
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        raise _PermanentError(
+                            f"Page exceeds {self.max_bytes} bytes at URL: {url}"
+                        )
+
+                charset = response.charset
+
+            html_hash = _html_digest(body)
+            extracted_text = _cache_get(_EXTRACTION_CACHE, html_hash)
+            if extracted_text is None:
+                # Decode only when the server declares a charset; otherwise the
+                # raw bytes go on and trafilatura sniffs the encoding itself
+                html_content: str | bytes = (
+                    body.decode(charset, "replace") if charset else bytes(body)
                 )
+                html_content = _prefilter_html(html_content, url)
 
+                # Extract main content using trafilatura
+                extracted_text = await _extract_off_loop(html_content, url)
+                if extracted_text:
+                    _cache_put(_EXTRACTION_CACHE, html_hash, extracted_text)
+
+            # Extraction is deterministic, so the same page would fail again
             if not extracted_text:
-                raise DocumentIngestionError(
-                    f"No extractable content found at URL: {url}"
-                )
+                raise _PermanentError(f"No extractable content found at URL: {url}")
 
             # Clean and format the extracted text
             cleaned_text = self._clean_extracted_content(extracted_text, url)
 
             if len(cleaned_text.strip()) < 100:
-                raise DocumentIngestionError(
+                raise _PermanentError(
                     f"Extracted content too short (less than 100 characters) from URL: {url}"
                 )
 
@@ -161,36 +543,15 @@ class URLExtractor:
         # Add URL as metadata at the beginning
         url_info = f"Source: {url}\n\n"
 
-        # Split into paragraphs and clean
-        paragraphs = text.split("\n\n")
-        cleaned_paragraphs = []
-
-        for paragraph in paragraphs:
-            cleaned_para = self._clean_paragraph(paragraph)
-            if cleaned_para:
-                cleaned_paragraphs.append(cleaned_para)
-
-        # Join paragraphs
-        result = "\n\n".join(cleaned_paragraphs)
-
-        # Final cleaning
-        result = self._final_text_cleanup(result)
-
-        return url_info + result
-
-    def _clean_paragraph(self, paragraph: str) -> str:
-        """Clean a single paragraph."""
-
-        if not paragraph:
-            return ""
-
-        # Split into sentences
-        sentences = re.split(r"[.!?]+", paragraph)
-        cleaned_sentences = []
+        # Split the text into sentences in one scan, remembering which
+        # paragraph each sentence came from, so the whole document is cleaned
+        # as one batch
+        paragraph_ids = []
+        sentences = []
 
-        for sentence in sentences:
+        for paragraph_id, sentence in _iter_sentences(text):
             # Clean whitespace and basic formatting
-            cleaned_sentence = " ".join(sentence.split())
+            cleaned_sentence = _WS_RE.sub(" ", sentence).strip()
 
             # Skip if too short or likely artifact
             if len(cleaned_sentence) < 10:
@@ -199,105 +560,105 @@ class URLExtractor:
             if self._is_navigation_or_ui_text(cleaned_sentence):
                 continue
 
-            # Remove common web prefixes/suffixes
-            cleaned_sentence = self._remove_web_artifacts(cleaned_sentence)
+            paragraph_ids.append(paragraph_id)
+            sentences.append(cleaned_sentence)
 
-            if cleaned_sentence:
-                cleaned_sentences.append(cleaned_sentence)
+        # Write the cleaned sentences straight back out, paragraph by paragraph
+        buffer = io.StringIO()
+        current_paragraph = None
+        last_sentence = ""
 
-        if not cleaned_sentences:
-            return ""
+        for paragraph_id, sentence in zip(
+            paragraph_ids, self._remove_web_artifacts_batch(sentences), strict=True
+        ):
+            if not sentence:
+                continue
 
-        # Rejoin sentences
-        result = ". ".join(cleaned_sentences)
+            if paragraph_id == current_paragraph:
+                buffer.write(". ")
+            elif current_paragraph is not None:
+                # Add final period if missing
+                if not last_sentence.endswith((".", "!", "?")):
+                    buffer.write(".")
+                buffer.write("\n\n")
 
-        # Add final period if missing
-        if result and not result.endswith((".", "!", "?")):
-            result += "."
+            buffer.write(sentence)
+            current_paragraph = paragraph_id
+            last_sentence = sentence
 
-        return result
+        if current_paragraph is not None and not last_sentence.endswith(
+            (".", "!", "?")
+        ):
+            buffer.write(".")
+
+        # Final cleaning
+        return url_info + self._final_text_cleanup(buffer.getvalue())
 
     def _is_navigation_or_ui_text(self, text: str) -> bool:
         """Check if text is likely navigation or UI element."""
 
         text_lower = text.lower().strip()
 
-        # Common navigation and UI patterns
-        ui_patterns = [
-            r"^(click|tap|press)\s+(here|this|button)",
-            r"^(home|about|contact|menu|search|login|register)",
-            r"^(previous|next|back|forward|continue)",
-            r"^(skip to|jump to|go to)",
-            r"^(share|like|follow|subscribe)",
-            r"^(cookie|privacy|terms|policy)",
-            r"^\d+\s+(comments?|replies?|likes?)",
-            r"^(loading|please wait|redirecting)",
-            r"^(error|warning|success|info):",
-            r"^\w+\s+\|\s+\w+",  # Breadcrumb pattern
-        ]
-
-        for pattern in ui_patterns:
-            if re.match(pattern, text_lower):
-                return True
+        if _UI_COMBINED_RE.match(text_lower):
+            return True
 
         # Check for very short navigation-like text
-        if len(text) < 30 and any(
-            word in text_lower
-            for word in ["menu", "nav", "link", "button", "tab", "page", "section"]
-        ):
+        if len(text) < 30 and _UI_WORDS_RE.search(text_lower):
             return True
 
         return False
 
+    def _remove_web_artifacts_batch(self, sentences: list[str]) -> list[str]:
+        """Remove common web artifacts from many single-line sentences at once.
+
+        The sentences are joined into one newline-separated string so that each
+        artifact pattern runs once over the batch instead of once per sentence.
+        None of the patterns match across a newline.
+        """
+
+        if not sentences:
+            return []
+
+        return self._remove_web_artifacts("\n".join(sentences)).split("\n")
+
     def _remove_web_artifacts(self, text: str) -> str:
-        """Remove common web artifacts from text."""
+        """Remove common web artifacts from text, line by line."""
+
+        # Each pass is skipped when a substring check shows it cannot match
 
         # Remove email addresses
-        text = re.sub(r"\S+@\S+\.\S+", "", text)
+        if "@" in text:
+            text = _EMAIL_RE.sub("", text)
 
         # Remove URLs (except if they're part of meaningful content)
-        text = re.sub(
-            r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+",
-            "",
-            text,
-        )
+        if "://" in text:
+            text = _URL_RE.sub("", text)
 
         # Remove phone numbers
-        text = re.sub(r"[\+]?[1-9]?[0-9]{3}-?[0-9]{3}-?[0-9]{4}", "", text)
+        text = _PHONE_RE.sub("", text)
 
         # Remove excessive punctuation
-        text = re.sub(r"[.]{3,}", "...", text)
-        text = re.sub(r"[-]{3,}", "---", text)
+        if "..." in text:
+            text = _DOTS_RE.sub("...", text)
+        if "---" in text:
+            text = _DASHES_RE.sub("---", text)
 
         # Remove standalone symbols
-        text = re.sub(r"\s+[|•→←↑↓]\s+", " ", text)
+        text = _SYMBOL_RE.sub(" ", text)
 
-        # Clean up whitespace
-        text = " ".join(text.split())
-
-        return text.strip()
+        # Clean up whitespace within each line, keeping the line count intact
+        text = _INLINE_WS_RE.sub(" ", text)
+        return _LINE_TRIM_RE.sub("", text)
 
     def _final_text_cleanup(self, text: str) -> str:
         """Final cleanup of the entire text."""
 
-        # Remove excessive newlines
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        # Remove lines that are just whitespace or punctuation
-        lines = text.split("\n")
-        cleaned_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if line and not re.match(r"^[^\w]*$", line):
-                cleaned_lines.append(line)
-
-        result = "\n".join(cleaned_lines)
+        # Strip each line, then drop lines that are empty or just punctuation
+        text = _LINE_EDGE_WS_RE.sub("\n", text + "\n")
+        text = _BLANK_LINE_RE.sub("", text)
 
         # Final whitespace cleanup
-        result = result.strip()
-
-        return result
+        return text.strip()
 
     async def extract_metadata(self, url: str) -> dict[str, Optional[str]]:
         """Extract metadata from URL (title, description, etc.)."""
@@ -308,7 +669,9 @@ class URLExtractor:
             )
 
         try:
-            async with self.session.get(url) as response:
+            async with self.session.get(
+                url, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
                 if response.status != 200:
                     return {}
 
@@ -335,48 +698,4 @@ class URLExtractor:
     def is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and accessible for content extraction."""
 
-        try:
-            parsed = urlparse(url)
-
-            # Check basic URL structure
-            if not parsed.scheme or not parsed.netloc:
-                return False
-
-            # Check if scheme is supported
-            if parsed.scheme not in ["http", "https"]:
-                return False
-
-            # Check for common file extensions that we can't process
-            path = parsed.path.lower()
-            unsupported_extensions = [
-                ".pdf",
-                ".doc",
-                ".docx",
-                ".xls",
-                ".xlsx",
-                ".ppt",
-                ".pptx",
-                ".zip",
-                ".rar",
-                ".tar",
-                ".gz",
-                ".mp3",
-                ".mp4",
-                ".avi",
-                ".jpg",
-                ".jpeg",
-                ".png",
-                ".gif",
-                ".svg",
-                ".exe",
-                ".dmg",
-            ]
-
-            for ext in unsupported_extensions:
-                if path.endswith(ext):
-                    return False
-
-            return True
-
-        except Exception:
-            return False
+        return _is_valid_url_cached(url)
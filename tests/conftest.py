@@ -4,14 +4,16 @@ import asyncio
 from collections.abc import AsyncGenerator
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import StaticPool
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from src.quickquiz.core.config import Settings
 from src.quickquiz.core.database import Base
 
-# Test database URL (SQLite for testing)
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+# Test database URL (named shared-cache in-memory SQLite, so every connection
+# in the process sees the same database)
+TEST_DATABASE_URL = "sqlite+aiosqlite:///file:memdb1?mode=memory&cache=shared&uri=true"
 
 
 class TestSettings(Settings):
@@ -37,11 +39,23 @@ async def test_engine():
     engine = create_async_engine(
         TEST_DATABASE_URL,
         echo=False,
-        poolclass=StaticPool,
         connect_args={"check_same_thread": False},
     )
 
-    # Create all tables
+    # Let SQLAlchemy emit BEGIN itself; the driver's own transaction handling
+    # breaks SAVEPOINT
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # Register the models on Base before creating their tables
+    import src.quickquiz.models.database  # noqa: F401
+
+    # Create all tables once per session
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -52,13 +66,46 @@ async def test_engine():
 
 @pytest.fixture
 async def test_db(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session."""
-    TestSessionLocal = async_sessionmaker(
-        test_engine, class_=AsyncSession, expire_on_commit=False
-    )
+    """Create test database session rolled back after each test.
+
+    The session joins an outer transaction and commits only to SAVEPOINTs, so
+    the schema is reused across tests while their data is not.
+    """
+    async with test_engine.connect() as conn:
+        await conn.begin()
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            yield session
+        await conn.rollback()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Import the API app once per session, only for tests that need it.
+
+    The app pulls in every service and parser, so tests that never touch
+    the API don't pay for importing them.
+    """
+    from src.quickquiz.api.main import app
+
+    return app
+
+
+@pytest.fixture(scope="session")
+async def aclient(app) -> AsyncGenerator[AsyncClient, None]:
+    """Create async API client shared by the test session."""
+    from src.quickquiz.core.database import engine as app_engine
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
 
-    async with TestSessionLocal() as session:
-        yield session
+    # Close connections the app opened on this loop
+    await app_engine.dispose()
 
 
 @pytest.fixture
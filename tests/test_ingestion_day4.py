@@ -1,52 +1,121 @@
 """Tests for document ingestion functionality - Day 4."""
 
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import tracemalloc
 import uuid
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
+import numpy as np
 import pytest
-from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.quickquiz.api.main import app
 from src.quickquiz.core.exceptions import DocumentIngestionError
-from src.quickquiz.models.schemas import DocumentCreate, SourceType
-from src.quickquiz.services.embeddings import EmbeddingService
-from src.quickquiz.services.ingestor import IngestionService
-from src.quickquiz.utils.pdf_parser import PDFParser
-from src.quickquiz.utils.text_processor import TextProcessor
-from src.quickquiz.utils.url_extractor import URLExtractor
-
-# Test client for API tests
-client = TestClient(app)
-
-
-@pytest.fixture
-def mock_db_session():
-    """Mock database session."""
-    session = MagicMock(spec=AsyncSession)
+from src.quickquiz.models.database import Document, DocumentChunk, EmbeddingCache
+from src.quickquiz.models.schemas import DocumentCreate, IngestionRequest, SourceType
+from src.quickquiz.utils.http_session import close_shared_session
+from src.quickquiz.utils.prompts import PromptTemplates
+from src.quickquiz.utils.text_processor import (
+    _SENTENCE_RE,
+    _TOKEN_COUNTS,
+    TextProcessor,
+    _get_encoder,
+)
+
+
+def _configure_db_session(session):
+    """Set up the mock database session's methods."""
     session.execute = AsyncMock()
     session.flush = AsyncMock()
     session.commit = AsyncMock()
     session.rollback = AsyncMock()
     session.add = MagicMock()
+
+
+def _configure_embedding_service(service):
+    """Set up the mock embedding service's attributes and methods."""
+    service.provider_name = "openai"
+    service.model = "text-embedding-ada-002"
+    service.generate_embedding = AsyncMock(
+        return_value=np.full(1536, 0.1, dtype=np.float32)
+    )
+    service.generate_embeddings_batch = AsyncMock(
+        return_value=np.full((5, 1536), 0.1, dtype=np.float32)
+    )
+
+
+@pytest.fixture(scope="module")
+def mock_db_session():
+    """Mock database session, specced once per module."""
+    session = MagicMock(spec=AsyncSession)
+    _configure_db_session(session)
     return session
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_embedding_service():
-    """Mock embedding service."""
+    """Mock embedding service, specced once per module."""
+    from src.quickquiz.services.embeddings import EmbeddingService
+
     service = MagicMock(spec=EmbeddingService)
-    service.generate_embedding = AsyncMock(return_value=[0.1] * 1536)
-    service.generate_embeddings_batch = AsyncMock(return_value=[[0.1] * 1536] * 5)
+    _configure_embedding_service(service)
     return service
 
 
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_db_session, mock_embedding_service):
+    """Restore the shared mocks after each test."""
+    yield
+    mock_db_session.reset_mock(return_value=True, side_effect=True)
+    _configure_db_session(mock_db_session)
+    mock_embedding_service.reset_mock(return_value=True, side_effect=True)
+    _configure_embedding_service(mock_embedding_service)
+
+
+async def _async_iter(items):
+    """Yield items asynchronously, like a streamed response body."""
+    for item in items:
+        yield item
+
+
+def _page_response(body=b"", status=200, headers=None):
+    """Build a mocked HTTP response streaming `body` in one chunk."""
+    response = AsyncMock()
+    response.status = status
+    response.headers = {"content-type": "text/html", **(headers or {})}
+    body_chunks = MagicMock()
+    body_chunks.__aiter__.return_value = [body]
+    response.content.iter_chunked = MagicMock(return_value=body_chunks)
+    response.charset = "utf-8"
+    return response
+
+
 @pytest.fixture
 def ingestion_service(mock_embedding_service):
     """Create ingestion service with mocked dependencies."""
+    from src.quickquiz.services.ingestor import IngestionService
+
     return IngestionService(mock_embedding_service)
 
 
+@pytest.fixture
+async def shared_session():
+    """Start without a shared HTTP session and close the one the test opens."""
+    await close_shared_session()
+    yield
+    await close_shared_session()
+
+
 class TestTextProcessor:
     """Test text processing functionality."""
 
@@ -56,15 +125,47 @@ class TestTextProcessor:
         assert processor.chunk_size == 500
         assert processor.chunk_overlap == 100
 
+    def test_encoder_shared(self):
+        """Test all processors share one tokenizer, loaded at most once."""
+        first = TextProcessor()
+        loads = _get_encoder.cache_info().misses
+
+        processors = [TextProcessor() for _ in range(99)]
+
+        assert all(p._enc is first._enc for p in processors)
+        assert id(first._enc) == id(processors[-1]._enc)
+        assert _get_encoder.cache_info().misses == loads
+
     @pytest.mark.asyncio
     async def test_chunk_text_simple(self):
-        """Test basic text chunking."""
-        processor = TextProcessor(chunk_size=100, chunk_overlap=20)
-        text = "This is a test document. " * 10
-
-        chunks = await processor.chunk_text(text)
-        assert len(chunks) > 1
-        assert all(len(chunk) > 0 for chunk in chunks)
+        """Test sliding window chunking of a large document."""
+        processor = TextProcessor(chunk_size=200, chunk_overlap=50, min_chunk_size=1)
+        sentence = "This is a test document. "
+        sentence_count = 10_000
+        text = sentence * sentence_count
+
+        boundaries_read = 0
+
+        def finditer(cleaned):
+            nonlocal boundaries_read
+            for match in _SENTENCE_RE.finditer(cleaned):
+                boundaries_read += 1
+                yield match
+
+        with patch("src.quickquiz.utils.text_processor._SENTENCE_RE") as sentence_re:
+            sentence_re.finditer.side_effect = finditer
+            chunks = await processor.chunk_text(text, preserve_structure=False)
+
+        # Windows of 8 sentences, keeping 2 as overlap, so a stride of 6
+        window = processor.chunk_size // len(sentence)
+        stride = window - processor.chunk_overlap // len(sentence)
+        assert len(chunks) == math.ceil((sentence_count - window) / stride) + 1
+        assert all(0 < len(chunk) <= processor.chunk_size for chunk in chunks)
+        # The document is scanned once and each boundary is read once, even
+        # though overlapping windows share sentences (the last sentence has
+        # no trailing whitespace after cleaning, so it is not a boundary)
+        sentence_re.finditer.assert_called_once()
+        assert boundaries_read == sentence_count - 1
 
     @pytest.mark.asyncio
     async def test_chunk_text_with_metadata(self):
@@ -81,6 +182,130 @@ class TestTextProcessor:
             assert metadata.token_count > 0
             assert 0.0 <= metadata.quality_score <= 1.0
 
+    def test_merged_chunks_are_tokenized_once(self):
+        """Test undersized chunks are merged and the result tokenized once."""
+        processor = TextProcessor(chunk_size=200, min_chunk_size=50)
+        text = "Tiny one. Tiny two. Tiny three. " + "A longer closing sentence. " * 3
+        analysis = processor._analyze_text(text)
+        bounds = [(0, 10), (10, 20), (20, 32), (32, len(text))]
+        chunks = [
+            (
+                text[start:end],
+                processor._create_chunk_metadata(
+                    text[start:end], index, start, end, analysis
+                ),
+            )
+            for index, (start, end) in enumerate(bounds)
+        ]
+
+        with patch.object(
+            processor, "estimate_tokens", wraps=processor.estimate_tokens
+        ) as estimate_tokens:
+            processed = processor._post_process_chunks(text, analysis, chunks)
+
+        assert len(processed) == 1
+        chunk_text, metadata = processed[0]
+        assert chunk_text == text
+        estimate_tokens.assert_called_once_with(text)
+        assert metadata.token_count == processor.estimate_tokens(text)
+        assert metadata.sentence_count == analysis.sentence_count(0, len(text))
+
+    @pytest.mark.asyncio
+    async def test_chunk_content_type_is_dominant_section_type(self):
+        """Test chunks of several section types take the type with most text."""
+        processor = TextProcessor(chunk_size=1000, min_chunk_size=10)
+        text = (
+            "A short intro paragraph.\n\n"
+            "- first item of a list that is much longer than the intro\n"
+            "- second item of a list that is much longer than the intro\n"
+            "- third item of a list that is much longer than the intro"
+        )
+
+        chunks = await processor.chunk_text_with_metadata(text)
+
+        assert [metadata.content_type for _, metadata in chunks] == ["list"]
+        assert processor._combine_section_types({"paragraph": 40, "list": 12}) == (
+            "paragraph"
+        )
+
+    def test_merged_chunk_takes_content_type_of_longer_half(self):
+        """Test merging an undersized chunk keeps a real content type."""
+        processor = TextProcessor(chunk_size=200, min_chunk_size=50)
+        text = "- a list item\n\nA closing paragraph that is long. " * 2
+        analysis = processor._analyze_text(text)
+        bounds = [(0, 13), (13, len(text))]
+        chunks = [
+            (
+                text[start:end],
+                processor._create_chunk_metadata(
+                    text[start:end], index, start, end, analysis, content_type
+                ),
+            )
+            for index, ((start, end), content_type) in enumerate(
+                zip(bounds, ["list", "paragraph"], strict=True)
+            )
+        ]
+
+        processed = processor._post_process_chunks(text, analysis, chunks)
+
+        assert len(processed) == 1
+        assert processed[0][1].content_type == "paragraph"
+
+    def test_title_detection_matches_per_chunk_search(self):
+        """Test document-wide title detection agrees with searching each chunk."""
+        processor = TextProcessor()
+        # The unbounded pattern searched one chunk at a time before analysis
+        # moved to a single pass over the document
+        per_chunk = re.compile(r"^(#{1,6}\s+|[A-Z][^.!?]*:?\s*$)", re.MULTILINE)
+        paragraphs = [
+            "Intro text here. More epsilon:",
+            "Alpha heading",
+            "Heading Gamma",
+            "A sentence ends here. Another follows it.",
+            "lower case line without punctuation",
+            "# Markdown title",
+            "Section two:",
+            "Is this a question? Yes it is.",
+        ]
+        text = processor._clean_text("\n\n".join(paragraphs))
+        analysis = processor._analyze_text(text)
+        spans = [(m.start(), m.end()) for m in re.finditer(r"[^\n]+", text)]
+
+        assert analysis.has_title(spans[0][0], spans[2][1])
+        for i, (start, _) in enumerate(spans):
+            for _, end in spans[i:]:
+                expected = bool(per_chunk.search(text[start:end]))
+                assert analysis.has_title(start, end) == expected
+
+    @pytest.mark.asyncio
+    async def test_chunk_offsets_match_text(self):
+        """Test every chunk is the document slice at its recorded offsets."""
+        paragraphs = [
+            "Heading beta",
+            "Alpha heading",
+            "A short sentence.",
+            "This one runs a little longer, on and on. It has two sentences!",
+            "- item one\n- item two",
+            "Why? Because.",
+            "This paragraph is long enough on its own to force a chunk break, "
+            "as it runs past the chunk size.",
+        ]
+        rng = random.Random(0)
+
+        for _ in range(2000):
+            processor = TextProcessor(
+                chunk_size=rng.randint(20, 200),
+                chunk_overlap=rng.randint(0, 40),
+                min_chunk_size=rng.randint(1, 60),
+            )
+            raw = "\n\n".join(rng.choices(paragraphs, k=rng.randint(1, 30)))
+            text = processor._clean_text(raw)
+
+            chunks = await processor.chunk_text_with_metadata(raw)
+            assert chunks
+            for chunk, metadata in chunks:
+                assert chunk == text[metadata.start_char : metadata.end_char]
+
     def test_estimate_tokens(self):
         """Test token estimation."""
         processor = TextProcessor()
@@ -89,6 +314,42 @@ class TestTextProcessor:
         assert tokens > 0
         assert tokens < len(text)  # Should be less than character count
 
+    def test_estimate_tokens_is_cached(self):
+        """Test repeated token estimates of the same text are cached."""
+        processor = TextProcessor()
+        text = "This sentence is only tokenized once."
+
+        with (
+            patch.dict(_TOKEN_COUNTS, clear=True),
+            patch(
+                "src.quickquiz.utils.text_processor._encode", return_value=7
+            ) as mock_encode,
+        ):
+            assert processor.estimate_tokens(text) == 7
+            assert processor.estimate_tokens(text) == 7
+
+        assert mock_encode.call_count == 1
+
+    def test_token_count_cache_does_not_hold_texts(self):
+        """Test the token count cache is bounded and keeps only digests."""
+        from src.quickquiz.utils import text_processor
+
+        processor = TextProcessor()
+        large_text = "A long document sentence. " * 10_000
+
+        with (
+            patch.dict(_TOKEN_COUNTS, clear=True),
+            patch.object(text_processor, "_TOKEN_CACHE_SIZE", 2),
+        ):
+            processor.estimate_tokens(large_text)
+            processor.estimate_tokens("First short text.")
+            processor.estimate_tokens("Second short text.")
+
+            assert len(_TOKEN_COUNTS) == 2
+            for digest, encoding in _TOKEN_COUNTS:
+                assert len(digest) == 16
+                assert large_text not in encoding
+
     def test_truncate_to_tokens(self):
         """Test text truncation by tokens."""
         processor = TextProcessor()
@@ -99,6 +360,7 @@ class TestTextProcessor:
         assert processor.estimate_tokens(truncated) <= 50
 
 
+@pytest.mark.slow
 class TestPDFParser:
     """Test PDF parsing functionality."""
 
@@ -106,22 +368,130 @@ class TestPDFParser:
     @patch("src.quickquiz.utils.pdf_parser.aiohttp.ClientSession.get")
     async def test_extract_from_url_success(self, mock_get):
         """Test successful PDF extraction from URL."""
-        # Mock HTTP response
+        from src.quickquiz.utils.pdf_parser import PDFParser
+
+        # Mock HTTP response streamed in chunks
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.read = AsyncMock(return_value=b"mock pdf content")
+        mock_response.headers = {}
+        mock_response.content.iter_chunked = lambda n: _async_iter(
+            [b"mock ", b"pdf ", b"content"]
+        )
         mock_get.return_value.__aenter__.return_value = mock_response
 
         parser = PDFParser()
+        downloaded = []
+
+        async def read_file(file_path):
+            with open(file_path, "rb") as f:
+                downloaded.append(f.read())
+            return "Extracted text"
 
-        with patch.object(parser, "extract_from_bytes", return_value="Extracted text"):
+        with patch.object(parser, "extract_from_file", side_effect=read_file):
             result = await parser.extract_from_url("https://example.com/test.pdf")
             assert result == "Extracted text"
 
+        assert downloaded == [b"mock pdf content"]
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.pdf_parser.aiohttp.ClientSession.get")
+    async def test_extract_from_url_streams_download(self, mock_get):
+        """Test large PDF downloads are streamed to disk, not held in memory."""
+        from src.quickquiz.utils.pdf_parser import _DOWNLOAD_CHUNK_SIZE, PDFParser
+
+        chunk = b"x" * _DOWNLOAD_CHUNK_SIZE
+        chunk_count = 512  # 32 MB
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {}
+        mock_response.content.iter_chunked = MagicMock(
+            return_value=_async_iter([chunk] * chunk_count)
+        )
+        mock_get.return_value.__aenter__.return_value = mock_response
+
+        parser = PDFParser()
+        sizes = []
+
+        async def file_size(file_path):
+            sizes.append(os.path.getsize(file_path))
+            return "Extracted text"
+
+        with patch.object(parser, "extract_from_file", side_effect=file_size):
+            tracemalloc.start()
+            try:
+                await parser.extract_from_url("https://example.com/large.pdf")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        mock_response.content.iter_chunked.assert_called_once_with(_DOWNLOAD_CHUNK_SIZE)
+        assert sizes == [len(chunk) * chunk_count]
+        # Far below the 32 MB downloaded, so the body was never buffered
+        assert peak < 2 * 1024 * 1024
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.pdf_parser.aiohttp.ClientSession.get")
+    async def test_extract_from_url_rejects_declared_oversize(self, mock_get):
+        """Test a PDF whose Content-Length exceeds the limit is not downloaded."""
+        from src.quickquiz.utils.pdf_parser import PDFParser
+
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {"content-length": str(2 * 1024 * 1024)}
+        mock_response.content.iter_chunked = MagicMock()
+        mock_get.return_value.__aenter__.return_value = mock_response
+
+        parser = PDFParser()
+
+        with (
+            patch("src.quickquiz.utils.pdf_parser.settings.max_file_size_mb", 1),
+            patch.object(parser, "extract_from_file") as mock_extract,
+        ):
+            with pytest.raises(DocumentIngestionError, match="too large"):
+                await parser.extract_from_url("https://example.com/large.pdf")
+
+        mock_response.content.iter_chunked.assert_not_called()
+        mock_extract.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.pdf_parser.aiohttp.ClientSession.get")
+    async def test_extract_from_url_aborts_oversize_stream(self, mock_get):
+        """Test a download without Content-Length stops once past the limit."""
+        from src.quickquiz.utils.pdf_parser import _DOWNLOAD_CHUNK_SIZE, PDFParser
+
+        chunks_read = 0
+
+        async def body():
+            nonlocal chunks_read
+            for _ in range(64):  # 4 MB
+                chunks_read += 1
+                yield b"x" * _DOWNLOAD_CHUNK_SIZE
+
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {}
+        mock_response.content.iter_chunked = lambda n: body()
+        mock_get.return_value.__aenter__.return_value = mock_response
+
+        parser = PDFParser()
+
+        with (
+            patch("src.quickquiz.utils.pdf_parser.settings.max_file_size_mb", 1),
+            patch.object(parser, "extract_from_file") as mock_extract,
+        ):
+            with pytest.raises(DocumentIngestionError, match="1 MB limit"):
+                await parser.extract_from_url("https://example.com/large.pdf")
+
+        # 16 chunks fill the limit exactly, so the 17th is the first one over
+        assert chunks_read == 1024 * 1024 // _DOWNLOAD_CHUNK_SIZE + 1
+        mock_extract.assert_not_called()
+
     @pytest.mark.asyncio
     @patch("src.quickquiz.utils.pdf_parser.aiohttp.ClientSession.get")
     async def test_extract_from_url_http_error(self, mock_get):
         """Test PDF extraction with HTTP error."""
+        from src.quickquiz.utils.pdf_parser import PDFParser
+
         mock_response = AsyncMock()
         mock_response.status = 404
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -131,32 +501,428 @@ class TestPDFParser:
         with pytest.raises(DocumentIngestionError, match="Failed to download PDF"):
             await parser.extract_from_url("https://example.com/nonexistent.pdf")
 
+    @pytest.mark.asyncio
+    async def test_pdf_parse_does_not_block_loop(self):
+        """Test PDF parsing leaves the event loop free for other tasks."""
+        from src.quickquiz.utils.pdf_parser import PDFParser
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_parse(source):
+            # Run on the event loop, this would wait until the timeout,
+            # since nothing else could run to release it
+            started.set()
+            if not release.wait(timeout=5):
+                raise TimeoutError("parse was never released")
+            return "Extracted text"
+
+        parser = PDFParser()
+
+        with patch(
+            "src.quickquiz.utils.pdf_parser._extract_pdf_text",
+            side_effect=blocking_parse,
+        ):
+            parse = asyncio.create_task(parser.extract_from_bytes(b"mock pdf content"))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+
+            # The loop runs this while the parse is still blocked
+            assert not parse.done()
+            release.set()
+
+            assert await parse == "Extracted text"
+
+    @pytest.mark.asyncio
+    async def test_parse_pool_spawns_workers_and_shuts_down(self, app, shared_session):
+        """Test the parse pool does not fork and is shut down with the app."""
+        from src.quickquiz.api.main import lifespan
+        from src.quickquiz.utils import pdf_parser
+
+        with patch.object(pdf_parser.settings, "pdf_parsing_processes", 1):
+            pool = pdf_parser._get_parse_pool()
+
+        assert pool._mp_context.get_start_method() == "spawn"
+
+        async with lifespan(app):
+            assert pdf_parser._PARSE_POOL is pool
+        assert pdf_parser._PARSE_POOL is None
 
+    @pytest.mark.asyncio
+    async def test_broken_parse_pool_is_replaced(self):
+        """Test a dead worker does not leave PDF parsing failing for good."""
+        from concurrent.futures.process import BrokenProcessPool
+
+        from src.quickquiz.utils import pdf_parser
+
+        try:
+            with (
+                patch.object(pdf_parser.settings, "pdf_parsing_processes", 1),
+                patch.object(pdf_parser, "_PROCESS_PARSE_MIN_BYTES", 0),
+            ):
+                pool = pdf_parser._get_parse_pool()
+                with pytest.raises(BrokenProcessPool):
+                    pool.submit(os._exit, 1).result()
+
+                # The retry reaches a live worker, which rejects the bytes
+                with pytest.raises(
+                    DocumentIngestionError, match="Failed to extract text"
+                ) as exc_info:
+                    await pdf_parser.PDFParser().extract_from_bytes(b"not a pdf")
+
+                assert not isinstance(exc_info.value.__cause__, BrokenProcessPool)
+                assert "BrokenProcessPool" not in str(exc_info.value)
+                assert pdf_parser._PARSE_POOL is not None
+                assert pdf_parser._PARSE_POOL is not pool
+        finally:
+            pdf_parser.PDFParser.shutdown_pool()
+
+    @pytest.mark.asyncio
+    @patch("aiohttp.ClientSession.get")
+    async def test_pdf_and_url_share_session(self, mock_get, shared_session):
+        """Test PDF and URL fetches reuse one pooled HTTP session."""
+        from src.quickquiz.utils.pdf_parser import PDFParser
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        mock_response = AsyncMock()
+        mock_response.status = 404
+        mock_get.return_value.__aenter__.return_value = mock_response
+
+        parser = PDFParser()
+
+        with patch("aiohttp.TCPConnector", wraps=aiohttp.TCPConnector) as connector:
+            for i in range(5):
+                with pytest.raises(DocumentIngestionError):
+                    await parser.extract_from_url(f"https://example.com/{i}.pdf")
+
+                async with URLExtractor() as extractor:
+                    with pytest.raises(DocumentIngestionError):
+                        await extractor.extract_content(f"https://example.com/{i}")
+
+        assert connector.call_count == 1
+        assert mock_get.call_count == 10
+
+
+@pytest.mark.slow
 class TestURLExtractor:
     """Test URL content extraction."""
 
     @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor._get_extract_pool", return_value=None)
     @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
     @patch("src.quickquiz.utils.url_extractor.trafilatura.extract")
-    async def test_extract_content_success(self, mock_extract, mock_get):
+    async def test_extract_content_success(self, mock_extract, mock_get, _mock_pool):
         """Test successful URL content extraction."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
         # Mock HTTP response
         mock_response = AsyncMock()
         mock_response.status = 200
         mock_response.headers = {"content-type": "text/html"}
-        mock_response.text = AsyncMock(return_value="<html>Test content</html>")
+        html = "<html><body><p>" + "Test content. " * 20 + "</p></body></html>"
+        body_chunks = MagicMock()
+        body_chunks.__aiter__.return_value = [html.encode()]
+        mock_response.content.iter_chunked = MagicMock(return_value=body_chunks)
+        mock_response.charset = "utf-8"
         mock_get.return_value.__aenter__.return_value = mock_response
 
         # Mock trafilatura extraction
-        mock_extract.return_value = "Extracted web content"
+        mock_extract.return_value = "Extracted web content. " * 10
 
         async with URLExtractor() as extractor:
             result = await extractor.extract_content("https://example.com/article")
             assert "Extracted web content" in result
             assert "https://example.com/article" in result  # Should include source URL
 
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor._get_extract_pool", return_value=None)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    @patch("src.quickquiz.utils.url_extractor.trafilatura.extract")
+    async def test_trafilatura_config_reused(self, mock_extract, mock_get, _mock_pool):
+        """Test the trafilatura config is built once and reused across pages."""
+        from trafilatura.settings import use_config
+
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        mock_extract.return_value = "Extracted web content. " * 10
+
+        def page_response(i):
+            response = AsyncMock()
+            response.status = 200
+            response.headers = {"content-type": "text/html"}
+            html = (
+                f"<html><body><p>Page {i}. " + "Content. " * 30 + "</p></body></html>"
+            )
+            body_chunks = MagicMock()
+            body_chunks.__aiter__.return_value = [html.encode()]
+            response.content.iter_chunked = MagicMock(return_value=body_chunks)
+            response.charset = "utf-8"
+            return response
+
+        with (
+            patch("src.quickquiz.utils.url_extractor._WORKER_CONFIG", None),
+            patch(
+                "src.quickquiz.utils.url_extractor.use_config", wraps=use_config
+            ) as mock_use_config,
+        ):
+            async with URLExtractor() as extractor:
+                for i in range(10):
+                    mock_get.return_value.__aenter__.return_value = page_response(i)
+                    await extractor.extract_content(f"https://example.com/page/{i}")
+
+        assert mock_extract.call_count == 10
+        assert mock_use_config.call_count == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("response", "error"),
+        [
+            (_page_response(status=404), "not found"),
+            (_page_response(status=403), "forbidden"),
+            (
+                _page_response(headers={"content-type": "application/json"}),
+                "Unsupported content type",
+            ),
+            (
+                _page_response(headers={"content-length": str(6 * 1024 * 1024)}),
+                "too large",
+            ),
+            (
+                _page_response(b"<html><body><p>Hi</p></body></html>"),
+                "No extractable content",
+            ),
+        ],
+        ids=["not-found", "forbidden", "content-type", "oversize", "empty-page"],
+    )
+    @patch("src.quickquiz.utils.url_extractor.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    async def test_permanent_failures_are_not_retried(
+        self, mock_get, mock_sleep, response, error
+    ):
+        """Test failures that a retry cannot fix are raised on the first attempt."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        mock_get.return_value.__aenter__.return_value = response
+
+        async with URLExtractor() as extractor:
+            with pytest.raises(DocumentIngestionError, match=error):
+                await extractor.extract_content("https://example.com/permanent")
+
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    async def test_oversized_body_is_rejected_while_streaming(
+        self, mock_get, mock_sleep
+    ):
+        """Test a body without Content-Length stops being read past max_bytes."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        chunks_read = 0
+
+        async def body():
+            nonlocal chunks_read
+            for _ in range(64):
+                chunks_read += 1
+                yield b"x" * 512
+
+        response = _page_response()
+        response.content.iter_chunked = lambda n: body()
+        mock_get.return_value.__aenter__.return_value = response
+
+        async with URLExtractor(max_bytes=1024) as extractor:
+            with pytest.raises(DocumentIngestionError, match="exceeds 1024 bytes"):
+                await extractor.extract_content("https://example.com/endless")
+
+        # Two chunks fill the limit exactly, so the third is the first one over
+        assert chunks_read == 3
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor._get_extract_pool", return_value=None)
+    @patch("src.quickquiz.utils.url_extractor.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    @patch("src.quickquiz.utils.url_extractor.trafilatura.extract")
+    async def test_short_content_is_not_retried(
+        self, mock_extract, mock_get, mock_sleep, _mock_pool
+    ):
+        """Test a page whose extracted text is too short is not fetched again."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        html = "<html><body><p>" + "Short page. " * 20 + "</p></body></html>"
+        mock_get.return_value.__aenter__.return_value = _page_response(html.encode())
+        mock_extract.return_value = "Too short."
+
+        async with URLExtractor() as extractor:
+            with pytest.raises(DocumentIngestionError, match="too short"):
+                await extractor.extract_content("https://example.com/short")
+
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    async def test_server_errors_are_retried(self, mock_get, mock_sleep):
+        """Test transient server errors are retried with backoff."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        mock_get.return_value.__aenter__.return_value = _page_response(status=503)
+
+        async with URLExtractor(max_retries=3) as extractor:
+            with pytest.raises(DocumentIngestionError, match="after 3 attempts"):
+                await extractor.extract_content("https://example.com/unavailable")
+
+        assert mock_get.call_count == 3
+        assert mock_sleep.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor._get_extract_pool", return_value=None)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    @patch("src.quickquiz.utils.url_extractor.trafilatura.extract")
+    async def test_cached_url_is_not_fetched_again(
+        self, mock_extract, mock_get, _mock_pool
+    ):
+        """Test a URL extracted within the TTL is served from the cache."""
+        from src.quickquiz.utils import url_extractor
+
+        html = "<html><body><p>" + "Cached content. " * 20 + "</p></body></html>"
+        mock_get.side_effect = lambda *args, **kwargs: MagicMock(
+            __aenter__=AsyncMock(return_value=_page_response(html.encode()))
+        )
+        mock_extract.return_value = "Extracted web content. " * 10
+        url = "https://example.com/cached"
+
+        with (
+            patch.dict(url_extractor._URL_CACHE, clear=True),
+            patch.dict(url_extractor._EXTRACTION_CACHE, clear=True),
+        ):
+            async with url_extractor.URLExtractor() as extractor:
+                first = await extractor.extract_content(url)
+                second = await extractor.extract_content(url)
+                assert mock_get.call_count == 1
+
+                # Once the TTL has passed the page is fetched again
+                with patch.object(url_extractor.settings, "cache_ttl_urls", 0):
+                    await extractor.extract_content(url)
+
+        assert second == first
+        assert mock_get.call_count == 2
+        # The refetched page is unchanged, so it is not extracted again
+        assert mock_extract.call_count == 1
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.utils.url_extractor._get_extract_pool", return_value=None)
+    @patch("src.quickquiz.utils.url_extractor.aiohttp.ClientSession.get")
+    @patch("src.quickquiz.utils.url_extractor.trafilatura.extract")
+    async def test_identical_pages_are_extracted_once(
+        self, mock_extract, mock_get, _mock_pool
+    ):
+        """Test mirrored pages reuse the extraction of identical HTML."""
+        from src.quickquiz.utils import url_extractor
+
+        html = "<html><body><p>" + "Mirrored content. " * 20 + "</p></body></html>"
+        mock_get.side_effect = lambda *args, **kwargs: MagicMock(
+            __aenter__=AsyncMock(return_value=_page_response(html.encode()))
+        )
+        mock_extract.return_value = "Extracted web content. " * 10
+
+        with (
+            patch.dict(url_extractor._URL_CACHE, clear=True),
+            patch.dict(url_extractor._EXTRACTION_CACHE, clear=True),
+        ):
+            async with url_extractor.URLExtractor() as extractor:
+                first = await extractor.extract_content("https://a.example.com/page")
+                second = await extractor.extract_content("https://b.example.com/page")
+
+        assert mock_get.call_count == 2
+        assert mock_extract.call_count == 1
+        # Only the cleaned text is per URL; it carries its own source line
+        assert first.replace("a.example.com", "b.example.com") == second
+
+    @pytest.mark.asyncio
+    async def test_extract_many_returns_results_and_errors_in_order(self):
+        """Test extract_many maps each URL to its text or its error."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
+        urls = [f"https://example.com/{i}" for i in range(10)]
+        in_flight = peak = 0
+
+        async def extract_content(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Later URLs finish first, so results are not in completion order
+            await asyncio.sleep(0.001 * (len(urls) - int(url.rsplit("/", 1)[1])))
+            in_flight -= 1
+            if url.endswith(("3", "7")):
+                raise DocumentIngestionError(f"URL not found: {url}")
+            return f"Content of {url}"
+
+        extractor = URLExtractor()
+
+        with patch.object(extractor, "extract_content", side_effect=extract_content):
+            results = await extractor.extract_many(urls, concurrency=4)
+
+        assert peak == 4
+        for url, result in zip(urls, results, strict=True):
+            if url.endswith(("3", "7")):
+                assert isinstance(result, DocumentIngestionError)
+                assert url in str(result)
+            else:
+                assert result == f"Content of {url}"
+
+    @pytest.mark.asyncio
+    async def test_extract_pool_spawns_workers_and_shuts_down(
+        self, app, shared_session
+    ):
+        """Test the extraction pool does not fork and is shut down with the app."""
+        from src.quickquiz.api.main import lifespan
+        from src.quickquiz.utils import url_extractor
+
+        with patch.object(url_extractor.settings, "url_extraction_processes", 1):
+            pool = url_extractor._get_extract_pool()
+
+        assert pool._mp_context.get_start_method() == "spawn"
+
+        async with lifespan(app):
+            assert url_extractor._EXTRACT_POOL is pool
+        assert url_extractor._EXTRACT_POOL is None
+
+    @pytest.mark.asyncio
+    async def test_broken_extract_pool_is_replaced(self):
+        """Test a dead worker does not leave extraction failing for good."""
+        from concurrent.futures.process import BrokenProcessPool
+
+        from src.quickquiz.utils import url_extractor
+
+        html = "<html><body><article>{}</article></body></html>".format(
+            "<p>Enough article text to be extracted from the page.</p>" * 20
+        )
+
+        try:
+            with patch.object(url_extractor.settings, "url_extraction_processes", 1):
+                pool = url_extractor._get_extract_pool()
+                with pytest.raises(BrokenProcessPool):
+                    pool.submit(os._exit, 1).result()
+
+                text = await url_extractor._extract_off_loop(
+                    html, "https://example.com/article"
+                )
+
+                assert "Enough article text" in text
+                assert url_extractor._EXTRACT_POOL is not None
+                assert url_extractor._EXTRACT_POOL is not pool
+        finally:
+            url_extractor.URLExtractor.shutdown_pool()
+
     def test_is_valid_url(self):
         """Test URL validation."""
+        from src.quickquiz.utils.url_extractor import URLExtractor
+
         extractor = URLExtractor()
 
         assert extractor.is_valid_url("https://example.com")
@@ -166,41 +932,309 @@ class TestURLExtractor:
         assert not extractor.is_valid_url("ftp://example.com")
 
 
+class TestEmbeddingService:
+    """Test embedding generation."""
+
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.services.embeddings.AsyncOpenAI")
+    async def test_respects_openai_batch_limit(self, _mock_openai):
+        """Test batches are split only at the provider's 2048-input limit."""
+        from src.quickquiz.services.embeddings import EmbeddingService
+
+        async def create_embeddings(model, input):
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[float(len(text))]) for text in input]
+            return response
+
+        service = EmbeddingService()
+        service.client.embeddings.create = AsyncMock(side_effect=create_embeddings)
+        texts = [f"text {i}" for i in range(3000)]
+
+        embeddings = await service.generate_embeddings_batch(texts)
+
+        assert service.client.embeddings.create.call_count == 2
+        batch_sizes = [
+            len(call.kwargs["input"])
+            for call in service.client.embeddings.create.call_args_list
+        ]
+        assert batch_sizes == [2048, 952]
+        assert embeddings == [[float(len(text))] for text in texts]
+
+
+class TestEmbeddingQuantization:
+    """Test int8 quantization of cached embeddings."""
+
+    def test_embedding_roundtrip_int8(self):
+        """Test embeddings survive int8 quantization at a quarter of the size."""
+        from src.quickquiz.services.embeddings import dequantize_int8, quantize_int8
+
+        rng = np.random.default_rng(0)
+        orig = rng.standard_normal(1536).astype(np.float32)
+        orig /= np.sqrt((orig * orig).sum())
+
+        data, scale = quantize_int8(orig)
+        restored = dequantize_int8(data, scale)
+
+        assert np.allclose(orig, restored, atol=0.02)
+        cosine = (orig * restored).sum() / np.sqrt((restored * restored).sum())
+        assert cosine > 0.99
+
+        # int8 components plus a float32 scale, against float32 components
+        assert len(data) + np.float32(scale).nbytes == 1540
+        assert orig.nbytes == 6144
+
+
 class TestIngestionService:
     """Test document ingestion service."""
 
     @pytest.mark.asyncio
-    async def test_ingest_text_document(self, ingestion_service, mock_db_session):
-        """Test text document ingestion."""
+    async def test_ingest_text_document(
+        self, ingestion_service, mock_embedding_service, test_db
+    ):
+        """Test text document ingestion into a real database session."""
         document_data = DocumentCreate(
             title="Test Document",
             source_type=SourceType.TEXT,
-            content="This is test content for ingestion.",
+            content="This is test content for ingestion into a real database.",
+        )
+        mock_embedding_service.generate_embeddings_batch.side_effect = (
+            lambda texts: np.full((len(texts), 1536), 0.1, dtype=np.float32)
         )
 
-        # Mock database operations
-        mock_document = MagicMock()
-        mock_document.id = uuid.uuid4()
-        mock_document.title = document_data.title
-        mock_db_session.add.return_value = None
+        with patch.object(
+            ingestion_service, "_create_chunks", return_value=["chunk1", "chunk2"]
+        ):
+            document = await ingestion_service.ingest_document(test_db, document_data)
+
+        # Everything added was flushed and committed
+        assert len(test_db.new) == 0
+        assert document.status == "completed"
+
+        chunk_count = await test_db.scalar(
+            select(func.count())
+            .select_from(DocumentChunk)
+            .where(DocumentChunk.document_id == document.id)
+        )
+        assert chunk_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ingest_reuses_cached_embeddings(
+        self, ingestion_service, mock_embedding_service, test_db
+    ):
+        """Test ingesting known chunks embeds nothing new."""
+        mock_embedding_service.generate_embeddings_batch.return_value = np.array(
+            [np.full(1536, 0.1), np.full(1536, 0.2)], dtype=np.float32
+        )
+
+        with patch.object(
+            ingestion_service, "_create_chunks", return_value=["chunk1", "chunk2"]
+        ):
+            # First ingest embeds both chunks and caches them
+            await ingestion_service.ingest_document(
+                test_db,
+                DocumentCreate(
+                    title="First Document",
+                    source_type=SourceType.TEXT,
+                    content="This is test content for ingestion with cached embeddings.",
+                ),
+            )
+            assert mock_embedding_service.generate_embeddings_batch.call_count == 1
+
+            # Another document with the same chunks finds both in the cache
+            second = await ingestion_service.ingest_document(
+                test_db,
+                DocumentCreate(
+                    title="Second Document",
+                    source_type=SourceType.TEXT,
+                    content="This is other test content whose chunks are cached.",
+                ),
+            )
+            assert mock_embedding_service.generate_embeddings_batch.call_count == 1
+
+        embeddings = (
+            await test_db.scalars(
+                select(DocumentChunk.embedding)
+                .where(DocumentChunk.document_id == second.id)
+                .order_by(DocumentChunk.chunk_index)
+            )
+        ).all()
+        assert np.allclose(embeddings[0], 0.1, atol=0.01)
+        assert np.allclose(embeddings[1], 0.2, atol=0.01)
+
+    @pytest.mark.asyncio
+    async def test_cache_embeddings_ignores_existing_entries(
+        self, ingestion_service, test_db
+    ):
+        """Test caching an embedding another ingestion cached first succeeds."""
+        embedding = np.full(1536, 0.1, dtype=np.float32)
+
+        # Both ingestions missed the cache, then both insert the entry
+        await ingestion_service._cache_embeddings(test_db, ["hash"], [embedding], {})
+        await ingestion_service._cache_embeddings(test_db, ["hash"], [embedding], {})
+        await test_db.commit()
+
+        cached_count = await test_db.scalar(
+            select(func.count()).select_from(EmbeddingCache)
+        )
+        assert cached_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_cache_lookup_keeps_transaction_usable(
+        self, ingestion_service, test_db
+    ):
+        """Test a failed cache lookup only rolls back its own savepoint."""
+        with (
+            patch.object(
+                test_db, "begin_nested", wraps=test_db.begin_nested
+            ) as savepoint,
+            patch.object(
+                test_db, "execute", side_effect=OperationalError("SELECT", {}, None)
+            ),
+        ):
+            cached = await ingestion_service._find_cached_embeddings(test_db, ["hash"])
+
+        assert cached == {}
+        assert savepoint.call_count == 1
+        assert not test_db.in_nested_transaction()
+
+        # The session can still run statements
+        assert await test_db.scalar(select(func.count()).select_from(Document)) == 0
+
+    @pytest.mark.asyncio
+    async def test_embeddings_called_in_single_batch(
+        self, ingestion_service, mock_db_session, mock_embedding_service
+    ):
+        """Test all chunks of a document are embedded in one batch call."""
+        document_data = DocumentCreate(
+            title="Test Document",
+            source_type=SourceType.TEXT,
+            content="x. " * 500,
+        )
+        chunks = [f"chunk {i}" for i in range(12)]
+        mock_embedding_service.generate_embeddings_batch.side_effect = (
+            lambda texts: np.full((len(texts), 1536), 0.1, dtype=np.float32)
+        )
+        lookup_result = MagicMock()
+        lookup_result.all.return_value = []
+        mock_db_session.execute.return_value = lookup_result
 
         with patch.object(
             ingestion_service, "_find_existing_document", return_value=None
         ):
-            with patch.object(
-                ingestion_service, "_create_chunks", return_value=["chunk1", "chunk2"]
-            ):
-                # Mock document creation
-                with patch(
-                    "src.quickquiz.models.database.Document", return_value=mock_document
-                ):
-                    result = await ingestion_service.ingest_document(
-                        mock_db_session, document_data
-                    )
+            with patch.object(ingestion_service, "_create_chunks", return_value=chunks):
+                await ingestion_service.ingest_document(mock_db_session, document_data)
 
-                    assert mock_db_session.add.called
-                    assert mock_db_session.flush.called
-                    assert mock_db_session.commit.called
+        assert mock_embedding_service.generate_embeddings_batch.call_count == 1
+        assert mock_embedding_service.generate_embedding.call_count == 0
+        (texts,) = mock_embedding_service.generate_embeddings_batch.call_args.args
+        assert texts == chunks
+
+    @pytest.mark.asyncio
+    async def test_ingest_overlaps_embed_and_insert(
+        self, ingestion_service, mock_db_session, mock_embedding_service
+    ):
+        """Test bounded embedding sub-batches run concurrently with inserts."""
+        from src.quickquiz.core.config import settings
+
+        document_data = DocumentCreate(
+            title="Test Document",
+            source_type=SourceType.TEXT,
+            content="This is test content for pipelined embedding and ingestion.",
+        )
+        batch_count = 5
+        chunks = [f"chunk {i}" for i in range(batch_count * 64)]
+        events = []
+        in_flight = peak = 0
+
+        async def embeddings_batch(texts):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            events.append("embedded")
+            return np.full((len(texts), 1536), 0.1, dtype=np.float32)
+
+        mock_embedding_service.generate_embeddings_batch.side_effect = embeddings_batch
+        mock_db_session.flush.side_effect = lambda: events.append("flushed")
+        lookup_result = MagicMock()
+        lookup_result.all.return_value = []
+        mock_db_session.execute.return_value = lookup_result
+
+        with (
+            patch.object(settings, "embedding_concurrency", 2),
+            patch.object(
+                ingestion_service, "_find_existing_document", return_value=None
+            ),
+            patch.object(ingestion_service, "_create_chunks", return_value=chunks),
+        ):
+            await ingestion_service.ingest_document(mock_db_session, document_data)
+
+        assert (
+            mock_embedding_service.generate_embeddings_batch.call_count == batch_count
+        )
+        assert peak == 2
+        # Records of finished sub-batches are flushed while others are embedding
+        first = events.index("embedded")
+        last = len(events) - 1 - events[::-1].index("embedded")
+        assert "flushed" in events[first:last]
+
+        inserted = [
+            record.chunk_index
+            for (records,), _ in mock_db_session.add_all.call_args_list
+            for record in records
+            if isinstance(record, DocumentChunk)
+        ]
+        assert sorted(inserted) == list(range(len(chunks)))
+
+    @pytest.mark.asyncio
+    async def test_failed_embedding_batch_cancels_the_rest(
+        self, ingestion_service, mock_db_session, mock_embedding_service
+    ):
+        """Test a failed sub-batch cancels the sub-batches still pending."""
+        from src.quickquiz.core.config import settings
+
+        document_data = DocumentCreate(
+            title="Test Document",
+            source_type=SourceType.TEXT,
+            content="This is test content for a failing embedding sub-batch.",
+        )
+        batch_count = 5
+        chunks = [f"chunk {i}" for i in range(batch_count * 64)]
+        cancelled = 0
+
+        async def embeddings_batch(texts):
+            nonlocal cancelled
+            if texts[0] == "chunk 64":
+                raise RuntimeError("embedding API error")
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return np.full((len(texts), 1536), 0.1, dtype=np.float32)
+
+        mock_embedding_service.generate_embeddings_batch.side_effect = embeddings_batch
+        lookup_result = MagicMock()
+        lookup_result.all.return_value = []
+        mock_db_session.execute.return_value = lookup_result
+
+        with (
+            patch.object(settings, "embedding_concurrency", 2),
+            patch.object(
+                ingestion_service, "_find_existing_document", return_value=None
+            ),
+            patch.object(ingestion_service, "_create_chunks", return_value=chunks),
+        ):
+            with pytest.raises(DocumentIngestionError, match="embedding API error"):
+                await ingestion_service.ingest_document(mock_db_session, document_data)
+
+        # Sub-batches waiting for a slot never reach the API, and the ones in
+        # flight are cancelled
+        calls = mock_embedding_service.generate_embeddings_batch.call_count
+        assert calls < batch_count
+        assert cancelled == calls - 1
+        mock_db_session.add_all.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_ingest_duplicate_document(self, ingestion_service, mock_db_session):
@@ -208,12 +1242,13 @@ class TestIngestionService:
         document_data = DocumentCreate(
             title="Test Document",
             source_type=SourceType.TEXT,
-            content="This is test content.",
+            content="This is test content that has been ingested once already.",
         )
 
         # Mock existing document
         existing_doc = MagicMock()
         existing_doc.id = uuid.uuid4()
+        existing_doc.status = "completed"
 
         with patch.object(
             ingestion_service, "_find_existing_document", return_value=existing_doc
@@ -236,6 +1271,39 @@ class TestIngestionService:
         with pytest.raises(DocumentIngestionError, match="too short"):
             await ingestion_service.ingest_document(mock_db_session, document_data)
 
+    def test_content_hash_is_blake3(self, ingestion_service):
+        """Test BLAKE3 content hashes when configured."""
+        blake3 = pytest.importorskip("blake3")
+        content = "This is test content for hashing. " * 1000
+
+        with patch(
+            "src.quickquiz.services.ingestor.settings.content_hash_algorithm",
+            "blake3",
+        ):
+            content_hash = ingestion_service._create_content_hash(content)
+
+        algorithm, digest = content_hash.split(":")
+        assert algorithm == "blake3"
+        assert len(digest) == 64
+        assert digest == blake3.blake3(content.encode()).hexdigest()
+
+    def test_content_hash_algorithm_is_explicit(self, ingestion_service):
+        """Test the configured hash algorithm is used or fails, never swapped."""
+        content = "This is test content for hashing."
+
+        content_hash = ingestion_service._create_content_hash(content)
+        assert content_hash == "sha256:" + hashlib.sha256(content.encode()).hexdigest()
+
+        with (
+            patch(
+                "src.quickquiz.services.ingestor.settings.content_hash_algorithm",
+                "blake3",
+            ),
+            patch("src.quickquiz.services.ingestor.blake3", None),
+        ):
+            with pytest.raises(DocumentIngestionError, match="blake3"):
+                ingestion_service._create_content_hash(content)
+
     @pytest.mark.asyncio
     async def test_create_chunks(self, ingestion_service):
         """Test chunk creation."""
@@ -250,13 +1318,18 @@ class TestIngestionService:
 class TestIngestionAPI:
     """Test ingestion API endpoints."""
 
-    @patch("src.quickquiz.api.routes.ingest.get_db")
-    @patch("src.quickquiz.api.routes.ingest.get_ingestion_service")
-    def test_ingest_text_endpoint(self, mock_service, mock_db):
+    @pytest.mark.asyncio
+    @patch("src.quickquiz.api.routes.ingest.get_db_session")
+    async def test_ingest_text_endpoint(self, _mock_db_session, app, aclient):
         """Test text ingestion API endpoint."""
+        from src.quickquiz.api.routes.ingest import get_ingestion_service
+        from src.quickquiz.core.database import get_db
+        from src.quickquiz.services.ingestor import IngestionService
+
         # Mock dependencies
-        mock_service.return_value.ingest_document = AsyncMock()
-        mock_db.return_value = MagicMock()
+        mock_service = MagicMock(spec=IngestionService)
+        mock_db = MagicMock(spec=AsyncSession)
+        mock_db.commit = AsyncMock()
 
         # Mock successful ingestion
         mock_document = MagicMock()
@@ -265,30 +1338,173 @@ class TestIngestionAPI:
         mock_document.source_type = "text"
         mock_document.source_url = None
         mock_document.content_hash = "test_hash"
-        mock_document.metadata = {}
+        mock_document.status = "pending"
+        mock_document.meta = {}
         mock_document.created_at = "2024-01-01T00:00:00"
         mock_document.updated_at = None
 
-        mock_service.return_value.ingest_document.return_value = mock_document
-        mock_service.return_value._create_chunks.return_value = ["chunk1", "chunk2"]
-
-        response = client.post(
-            "/api/v1/documents/ingest-text",
-            json={
-                "title": "Test Document",
-                "source_type": "text",
-                "content": "This is test content for the API endpoint.",
-            },
+        mock_service.create_text_document = AsyncMock(
+            return_value=(mock_document, True)
         )
+        mock_service.ingest_document_chunks = AsyncMock()
+
+        app.dependency_overrides[get_db] = lambda: mock_db
+        app.dependency_overrides[get_ingestion_service] = lambda: mock_service
+        try:
+            response = await aclient.post(
+                "/api/v1/documents/ingest-text",
+                json={
+                    "title": "Test Document",
+                    "source_type": "text",
+                    "content": "This is test content for the API endpoint, "
+                    "long enough to be ingested.",
+                },
+            )
+        finally:
+            app.dependency_overrides.clear()
 
         assert response.status_code == 200
         data = response.json()
-        assert data["status"] == "completed"
-        assert data["message"] == "Text content ingested successfully"
+        assert data["status"] == "queued"
+        assert data["message"] == "Text content queued for ingestion"
+        assert data["document"]["id"] == str(mock_document.id)
+        assert data["job_id"] == str(mock_document.id)
+        mock_service.ingest_document_chunks.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_ingest_text_defers_embedding(
+        self, ingestion_service, mock_embedding_service, test_db
+    ):
+        """Test text ingestion schedules embedding instead of awaiting it."""
+        from fastapi import BackgroundTasks
+
+        from src.quickquiz.api.routes.ingest import (
+            _ingest_chunks_in_background,
+            ingest_text_content,
+        )
+
+        request = IngestionRequest(
+            title="Test Document",
+            source_type=SourceType.TEXT,
+            content="This is test content that is queued for background ingestion.",
+        )
+        background_tasks = BackgroundTasks()
+
+        response = await ingest_text_content(
+            request,
+            background_tasks,
+            db=test_db,
+            ingestion_service=ingestion_service,
+        )
+
+        assert response.status == "queued"
+        assert response.job_id == response.document.id
+        assert response.document.status == "pending"
+        mock_embedding_service.generate_embeddings_batch.assert_not_called()
+
+        # Chunking and embedding are left to the queued task
+        assert len(background_tasks.tasks) == 1
+        task = background_tasks.tasks[0]
+        assert task.func is _ingest_chunks_in_background
+        assert task.args[1] == response.document.id
+
+    @pytest.mark.asyncio
+    async def test_resubmitting_pending_text_does_not_queue_again(
+        self, ingestion_service, mock_embedding_service, test_db
+    ):
+        """Test content resubmitted while its ingestion runs is not queued twice."""
+        from fastapi import BackgroundTasks
+
+        from src.quickquiz.api.routes.ingest import ingest_text_content
+
+        request = IngestionRequest(
+            title="Test Document",
+            source_type=SourceType.TEXT,
+            content="This is test content that is resubmitted before it is ingested.",
+        )
+        background_tasks = BackgroundTasks()
+
+        first = await ingest_text_content(
+            request, background_tasks, db=test_db, ingestion_service=ingestion_service
+        )
+        second = await ingest_text_content(
+            request, background_tasks, db=test_db, ingestion_service=ingestion_service
+        )
+
+        assert first.status == "queued"
+        assert second.status == "pending"
+        assert second.job_id == first.job_id
+        assert second.document.status == "pending"
+        # Only the first submission has a job creating the chunks
+        assert len(background_tasks.tasks) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_background_ingestion_is_retried(
+        self, ingestion_service, mock_embedding_service, test_db
+    ):
+        """Test a failed queued ingestion is marked failed and can be redone."""
+        from src.quickquiz.api.routes.ingest import _ingest_chunks_in_background
+
+        @asynccontextmanager
+        async def db_session():
+            yield test_db
+
+        content = "This is test content whose first background ingestion fails."
+        document_data = DocumentCreate(
+            title="Test Document", source_type=SourceType.TEXT, content=content
+        )
+
+        document, queued = await ingestion_service.create_text_document(
+            test_db, document_data
+        )
+        await test_db.commit()
+        assert queued
+        assert document.status == "pending"
+
+        with (
+            patch("src.quickquiz.api.routes.ingest.get_db_session", db_session),
+            patch.object(
+                ingestion_service, "_create_chunks", return_value=["chunk1", "chunk2"]
+            ),
+        ):
+            # The embedding API fails; the document is marked failed
+            mock_embedding_service.generate_embeddings_batch.side_effect = RuntimeError(
+                "API unavailable"
+            )
+            await _ingest_chunks_in_background(ingestion_service, document.id, content)
+            await test_db.refresh(document)
+            assert document.status == "failed"
+
+            # Resubmitting the content queues the same document again
+            retried, queued = await ingestion_service.create_text_document(
+                test_db, document_data
+            )
+            await test_db.commit()
+            assert queued
+            assert retried.id == document.id
+
+            mock_embedding_service.generate_embeddings_batch.side_effect = (
+                lambda texts: np.full((len(texts), 1536), 0.1, dtype=np.float32)
+            )
+            await _ingest_chunks_in_background(ingestion_service, document.id, content)
+            await test_db.refresh(document)
+            assert document.status == "completed"
+
+        chunk_count = await test_db.scalar(
+            select(func.count())
+            .select_from(DocumentChunk)
+            .where(DocumentChunk.document_id == document.id)
+        )
+        assert chunk_count == 2
+
+        # Once completed, the content is deduplicated
+        _, queued = await ingestion_service.create_text_document(test_db, document_data)
+        assert not queued
 
-    def test_ingest_text_endpoint_missing_content(self):
+    @pytest.mark.asyncio
+    async def test_ingest_text_endpoint_missing_content(self, aclient):
         """Test text ingestion with missing content."""
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/documents/ingest-text",
             json={
                 "title": "Test Document",
@@ -300,9 +1516,10 @@ class TestIngestionAPI:
         assert response.status_code == 400
         assert "Content is required" in response.json()["detail"]
 
-    def test_ingest_text_endpoint_short_content(self):
+    @pytest.mark.asyncio
+    async def test_ingest_text_endpoint_short_content(self, aclient):
         """Test text ingestion with too short content."""
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/documents/ingest-text",
             json={
                 "title": "Test Document",
@@ -314,12 +1531,13 @@ class TestIngestionAPI:
         assert response.status_code == 400
         assert "at least 50 characters" in response.json()["detail"]
 
-    @patch("src.quickquiz.api.routes.ingest.get_db")
-    def test_list_documents_endpoint(self, mock_db):
+    @pytest.mark.asyncio
+    async def test_list_documents_endpoint(self, app, aclient):
         """Test document listing endpoint."""
+        from src.quickquiz.core.database import get_db
+
         # Mock database session
         mock_session = MagicMock()
-        mock_db.return_value = mock_session
 
         # Mock query result
         mock_result = MagicMock()
@@ -330,30 +1548,200 @@ class TestIngestionAPI:
             doc.source_type = "text"
             doc.source_url = None
             doc.content_hash = f"hash_{i}"
-            doc.metadata = {}
+            doc.status = "completed"
+            doc.meta = {}
             doc.created_at = "2024-01-01T00:00:00"
             doc.updated_at = None
 
         mock_result.scalars.return_value.all.return_value = mock_documents
         mock_session.execute = AsyncMock(return_value=mock_result)
 
-        response = client.get("/api/v1/documents/")
+        app.dependency_overrides[get_db] = lambda: mock_session
+        try:
+            response = await aclient.get("/api/v1/documents/")
+        finally:
+            app.dependency_overrides.clear()
 
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 3
 
-    def test_health_check_endpoints(self):
+    @pytest.mark.asyncio
+    async def test_health_check_endpoints(self, aclient):
         """Test health check endpoints."""
-        # Root health check
-        response = client.get("/health")
-        assert response.status_code == 200
-        assert response.json()["status"] == "healthy"
+        # Root and API health checks
+        responses = await asyncio.gather(
+            aclient.get("/health"), aclient.get("/api/v1/health")
+        )
 
-        # API health check
-        response = client.get("/api/v1/health")
-        assert response.status_code == 200
-        assert response.json()["status"] == "healthy"
+        for response in responses:
+            assert response.status_code == 200
+            assert response.json()["status"] == "healthy"
+
+
+class TestPromptTemplates:
+    """Test question generation prompts and batched response parsing."""
+
+    CONTEXTS = ["Photosynthesis context.", "Mitosis context.", "Osmosis context."]
+
+    @staticmethod
+    def _response(*entries):
+        """Build a batched response with (index, questions) entries."""
+        return json.dumps(
+            {
+                "results": [
+                    {"index": index, "questions": questions}
+                    for index, questions in entries
+                ]
+            }
+        )
+
+    def test_question_prompt_header_is_byte_identical_across_calls(self):
+        """Test that only the second block varies with the request."""
+        templates = PromptTemplates()
+        first = templates.get_question_generation_prompt_blocks(
+            "Photosynthesis context.", "easy", "multiple_choice"
+        )
+        second = templates.get_question_generation_prompt_blocks(
+            "Mitosis context.", "hard", "true_false", "Cell biology"
+        )
+
+        assert first[0] == second[0]
+        assert first[0]["text"].encode() == second[0]["text"].encode()
+        assert first[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in first[1]
+        assert first[1]["text"] != second[1]["text"]
+
+    def test_joined_blocks_match_question_prompt(self):
+        """Test that joining the blocks gives the single-string prompt."""
+        templates = PromptTemplates()
+        args = ("Mitosis context.", "hard", "true_false", "Cell biology")
+
+        prompt = templates.join_prompt_blocks(
+            templates.get_question_generation_prompt_blocks(*args)
+        )
+
+        assert prompt == templates.get_question_generation_prompt(*args)
+        # Everything the single-block template asked for is still there.
+        for expected in [
+            "You are an expert educational content creator.",
+            "Context:\nMitosis context.",
+            "- Difficulty: hard",
+            "- Question type: true_false",
+            "- Focus on the topic: Cell biology",
+            "- Question should test understanding, not just memorization",
+            "- Include clear, unambiguous answer options (A, B, C, D)",
+            "- Provide a detailed explanation for the correct answer",
+            "- Classify according to Bloom's taxonomy",
+            '"bloom_level": "Remember|Understand|Apply|Analyze|Evaluate|Create"',
+        ]:
+            assert expected in prompt
+        assert prompt.endswith("Generate one high-quality question:\n")
+
+    def test_batched_prompt_numbers_contexts_and_carries_topic(self):
+        """Test that contexts are numbered from 1 and the topic is kept."""
+        prompt = PromptTemplates().get_batched_question_generation_prompt(
+            self.CONTEXTS, difficulty="hard", topic="Cell biology"
+        )
+
+        for index, context in enumerate(self.CONTEXTS, start=1):
+            assert f"[{index}] {context}" in prompt
+        assert "- Difficulty: hard" in prompt
+        assert "- Focus on the topic: Cell biology" in prompt
+        assert "Focus on the topic" not in (
+            PromptTemplates().get_batched_question_generation_prompt(self.CONTEXTS)
+        )
+
+    def test_parse_well_formed_response(self):
+        """Test that every context is answered and nothing is retried."""
+        response = self._response(
+            (1, [{"question_text": "Q1"}]),
+            (2, [{"question_text": "Q2"}]),
+            (3, [{"question_text": "Q3"}]),
+        )
+
+        questions, retries = PromptTemplates().parse_batched_question_response(
+            response, self.CONTEXTS
+        )
+
+        assert questions == {
+            1: [{"question_text": "Q1"}],
+            2: [{"question_text": "Q2"}],
+            3: [{"question_text": "Q3"}],
+        }
+        assert retries == {}
+
+    @pytest.mark.parametrize(
+        "response_text", ["not json", '{"results": ', "[1, 2]", '{"results": 5}']
+    )
+    def test_parse_malformed_response_retries_every_context(self, response_text):
+        """Test that a malformed response falls back to one prompt per context."""
+        questions, retries = PromptTemplates().parse_batched_question_response(
+            response_text, self.CONTEXTS
+        )
+
+        assert questions == {}
+        assert sorted(retries) == [1, 2, 3]
+        for index, context in enumerate(self.CONTEXTS, start=1):
+            assert context in retries[index]
+
+    def test_parse_ignores_out_of_range_indices(self):
+        """Test that indices outside 1..len(contexts) are dropped and retried."""
+        response = self._response(
+            (0, [{"question_text": "Q0"}]),
+            (2, [{"question_text": "Q2"}]),
+            (4, [{"question_text": "Q4"}]),
+            (True, [{"question_text": "Qbool"}]),
+        )
+
+        questions, retries = PromptTemplates().parse_batched_question_response(
+            response, self.CONTEXTS
+        )
+
+        assert questions == {2: [{"question_text": "Q2"}]}
+        assert sorted(retries) == [1, 3]
+
+    def test_parse_retries_duplicate_indices(self):
+        """Test that an index answered twice is treated as ambiguous."""
+        response = self._response(
+            (1, [{"question_text": "Q1"}]),
+            (2, [{"question_text": "Q2a"}]),
+            (2, [{"question_text": "Q2b"}]),
+            (3, [{"question_text": "Q3"}]),
+        )
+
+        questions, retries = PromptTemplates().parse_batched_question_response(
+            response, self.CONTEXTS
+        )
+
+        assert sorted(questions) == [1, 3]
+        assert list(retries) == [2]
+        assert self.CONTEXTS[1] in retries[2]
+
+    def test_parse_missing_indices_get_retry_prompts(self):
+        """Test that missing or empty entries get individual retry prompts."""
+        templates = PromptTemplates()
+        response = self._response((1, [{"question_text": "Q1"}]), (3, []))
+
+        questions, retries = templates.parse_batched_question_response(
+            response, self.CONTEXTS, difficulty="easy", topic="Cell biology"
+        )
+
+        assert sorted(questions) == [1]
+        assert sorted(retries) == [2, 3]
+        assert retries[2] == templates.get_question_generation_prompt(
+            self.CONTEXTS[1], "easy", "multiple_choice", "Cell biology"
+        )
+
+    def test_parse_missing_indices_use_batch_prompt_for_several_questions(self):
+        """Test that retries ask for n_per_context questions on the topic."""
+        questions, retries = PromptTemplates().parse_batched_question_response(
+            self._response(), self.CONTEXTS, n_per_context=3, topic="Cell biology"
+        )
+
+        assert questions == {}
+        assert "Generate 3 diverse" in retries[1]
+        assert "Focus on these topics: Cell biology" in retries[1]
 
 
 class TestErrorHandling:
@@ -374,7 +1762,7 @@ class TestErrorHandling:
             mock_extract.side_effect = Exception("PDF extraction failed")
 
             with pytest.raises(
-                DocumentIngestionError, match="Failed to ingest document"
+                DocumentIngestionError, match="Failed to extract content"
             ):
                 await ingestion_service.ingest_document(mock_db_session, document_data)
 